@@ -1,21 +1,56 @@
+import time
+
+STARTUP_STARTED = time.perf_counter()
+
 import os
 import sys
 import json
-import zipfile
-import requests
+import copy
 import subprocess
 import platform
 import shutil
 import re
 import threading
-import time
-import webbrowser
-import hashlib
+import importlib
 from pathlib import Path
-from datetime import datetime
-import minecraft_launcher_lib
+from datetime import datetime, timedelta
+from collections import namedtuple, deque
+
+startup_phases = [("Стандартные модули", time.perf_counter() - STARTUP_STARTED)]
+
+class LazyModule:
+    load_times = {}
+    instances = []
+    
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        LazyModule.instances.append(self)
+    
+    def __getattr__(self, attr):
+        if self._module is None:
+            started = time.perf_counter()
+            self._module = importlib.import_module(self._name)
+            LazyModule.load_times[self._name] = time.perf_counter() - started
+        return getattr(self._module, attr)
+
+requests = LazyModule("requests")
+minecraft_launcher_lib = LazyModule("minecraft_launcher_lib")
+zipfile = LazyModule("zipfile")
+tarfile = LazyModule("tarfile")
+hashlib = LazyModule("hashlib")
+zlib = LazyModule("zlib")
+concurrent_futures = LazyModule("concurrent.futures")
+ctypes = LazyModule("ctypes")
+tomllib = LazyModule("tomllib")
+gzip = LazyModule("gzip")
+mmap = LazyModule("mmap")
+argparse = LazyModule("argparse")
+
+phase_started = time.perf_counter()
 from colored import fg, attr
-import tarfile
+startup_phases.append(("colored", time.perf_counter() - phase_started))
+phase_started = time.perf_counter()
 
 COLOR_RED = fg('red')
 COLOR_GREEN = fg('green')
@@ -31,42 +66,161 @@ NOTES_FILE = os.path.join(LAUNCHER_DATA_DIR, "notes.txt")
 ACCOUNTS_FILE = os.path.join(LAUNCHER_DATA_DIR, "launcher_profiles.json")
 JAVA_DIR = os.path.join(LAUNCHER_DATA_DIR, "java")
 MINECRAFT_DIR = os.path.join(LAUNCHER_DATA_DIR, "minecraft")
+CACHE_DIR = os.path.join(LAUNCHER_DATA_DIR, "cache")
+MANIFEST_CACHE_FILE = os.path.join(CACHE_DIR, "version_manifest.json")
+OBJECT_STORE_DIR = os.path.join(LAUNCHER_DATA_DIR, "objects")
+JAVA_CACHE_DIR = os.path.join(CACHE_DIR, "java")
+JAVA_REGISTRY_FILE = os.path.join(CACHE_DIR, "java_runtimes.json")
+JAVA_RUNTIME_CACHE_DIR = os.path.join(CACHE_DIR, "runtimes")
+JAVA_RUNTIME_MANIFEST_FILE = os.path.join(JAVA_RUNTIME_CACHE_DIR, "all.json")
+LAUNCH_CACHE_FILE = os.path.join(CACHE_DIR, "launch_commands.json")
+LAUNCH_CACHE_LIMIT = 50
+VERIFY_CACHE_FILE = os.path.join(CACHE_DIR, "verified_files.json")
+MOD_CACHE_FILE = os.path.join(CACHE_DIR, "mod_metadata.json")
+CRASH_INDEX_FILE = os.path.join(CACHE_DIR, "crash_index.json")
+CRASH_DIRS = ("crash-reports", "crashes")
+CRASH_HEAD_BYTES = 64 * 1024
+CRASH_SIGNATURE_FRAMES = 5
+LOG_INDEX_FILE = os.path.join(CACHE_DIR, "log_index.json")
+CDS_DIR = os.path.join(CACHE_DIR, "cds")
+CDS_INDEX_FILE = os.path.join(CDS_DIR, "index.json")
+CDS_ARCHIVE_LIMIT = 5
+CDS_MIN_JAVA = 13
+MENU_MARKERS = ["Sound engine started"]
+WARMUP_RESIDENT_FRACTION = 0.9
+LOG_CHECKPOINT_BYTES = 4 * 1024 * 1024
+LOG_ROLLOVER_SLACK = 3600
+LOG_HEADER_PATTERN = re.compile(rb'^\[(?:\d{1,2}\w{3}\d{4} )?(\d{2}):(\d{2}):(\d{2})(?:\.\d+)?\] \[[^\]\r\n]*/(TRACE|DEBUG|INFO|WARN|ERROR|FATAL)\]', re.MULTILINE)
+MOD_BUILTIN_IDS = {"minecraft", "java", "fabricloader", "quilt_loader", "forge", "neoforge", "javafml", "lowcodefml"}
+MOD_LOADER_COMPAT = {"fabric": {"fabric"}, "quilt": {"quilt", "fabric"}, "forge": {"forge"}, "neoforge": {"neoforge"}}
+GAME_LOGS_DIR = os.path.join(LAUNCHER_DATA_DIR, "game_logs")
+GAME_OUTPUT_LINES = 5000
+GAME_LOG_MAX_BYTES = 10 * 1024 * 1024
+GAME_LOG_BACKUPS = 3
+LOADER_CACHE_DIR = os.path.join(CACHE_DIR, "loaders")
+LOADER_CATALOG_SCHEMA = 2
+FABRIC_META_URL = "https://meta.fabricmc.net/v2/versions"
+QUILT_META_URL = "https://meta.quiltmc.org/v3/versions"
+NEOFORGE_VERSIONS_URL = "https://maven.neoforged.net/api/maven/versions/releases/net/neoforged/neoforge"
+BACKUP_DIR = os.path.join(LAUNCHER_DATA_DIR, "backups")
+BACKUP_CHUNKS_DIR = os.path.join(BACKUP_DIR, "chunks")
+BACKUP_SNAPSHOTS_DIR = os.path.join(BACKUP_DIR, "snapshots")
+BACKUP_CHUNK_SIZE = 4 * 1024 * 1024
+BACKUP_FOLDERS = ["saves", "resourcepacks", "config", "shaderpacks", "schematics", "mods"]
+BACKUP_STORED_EXTENSIONS = {".jar", ".zip", ".png", ".jpg", ".jpeg", ".webp", ".ogg", ".mp3", ".mca", ".mcc", ".dat", ".gz", ".xz", ".7z", ".rar", ".litematic", ".schem", ".nbt"}
+BACKUP_INLINE_LIMIT = 16 * 1024 * 1024
+VERSION_MANIFEST_URL = "https://piston-meta.mojang.com/mc/game/version_manifest_v2.json"
+RESOURCES_URL = "https://resources.download.minecraft.net"
+LIBRARIES_URL = "https://libraries.minecraft.net/"
+MANIFEST_MAX_AGE = 600
+JAVA_RUNTIME_MANIFEST_URL = "https://launchermeta.mojang.com/v1/products/java-runtime/2ec0cc96c44e5a76b9c8b7c39df7210883d12871/all.json"
+JAVA_RUNTIME_MANIFEST_MAX_AGE = 86400
 
-os.makedirs(LAUNCHER_DATA_DIR, exist_ok=True)
-os.makedirs(JAVA_DIR, exist_ok=True)
+VERSION_TYPES = {
+    "alpha": "old_alpha",
+    "beta": "old_beta",
+    "snapshot": "snapshot",
+    "release": "release"
+}
 
-def load_config():
-    if os.path.exists(CONFIG_FILE):
+def ensure_launcher_dirs():
+    os.makedirs(LAUNCHER_DATA_DIR, exist_ok=True)
+    os.makedirs(JAVA_DIR, exist_ok=True)
+
+def write_json_atomic(path, data, indent=None):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+class JsonFileStore:
+    def __init__(self, path, normalize):
+        self.path = path
+        self.normalize = normalize
+        self._lock = threading.RLock()
+        self._data = None
+        self._stamp = None
+    
+    def _file_stamp(self):
         try:
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                if "separate_version_dirs" not in config:
-                    config["separate_version_dirs"] = False
-                if "java_path" not in config:
-                    config["java_path"] = None
-                if "java_version" not in config:
-                    config["java_version"] = "17"
-                return config
-        except json.JSONDecodeError:
-            return {"java_args": "-Xmx2G -Xms1G", "selected_version": None, "current_account": None, "separate_version_dirs": False, "java_path": None, "java_version": "17"}
-    return {"java_args": "-Xmx2G -Xms1G", "selected_version": None, "current_account": None, "separate_version_dirs": False, "java_path": None, "java_version": "17"}
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+    
+    def load(self):
+        with self._lock:
+            stamp = self._file_stamp()
+            if self._data is None or stamp != self._stamp:
+                data = None
+                if stamp is not None:
+                    try:
+                        with open(self.path, 'r', encoding='utf-8') as f:
+                            data = json.load(f)
+                    except (json.JSONDecodeError, OSError):
+                        data = None
+                self._data = self.normalize(data)
+                self._stamp = stamp
+            return copy.deepcopy(self._data)
+    
+    def save(self, data):
+        with self._lock:
+            write_json_atomic(self.path, data, indent=4)
+            self._data = copy.deepcopy(data)
+            self._stamp = self._file_stamp()
+
+DEFAULT_CONFIG = {
+    "java_args": "-Xmx2G -Xms1G",
+    "selected_version": None,
+    "current_account": None,
+    "separate_version_dirs": False,
+    "java_path": None,
+    "java_version": "17",
+    "java_auto": None,
+    "download_workers": 16,
+    "java_download_segments": 4,
+    "backup_keep_last": 10,
+    "backup_keep_daily": 7,
+    "backup_compress_level": 6,
+    "loader_catalog_ttl": 21600,
+    "prefetch": False,
+    "jvm_profiles": {},
+    "version_profiles": {},
+    "appcds": False,
+    "warmup": False,
+    "warmup_budget_mb": 512
+}
+
+def normalize_config(data):
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    if isinstance(data, dict):
+        config.update(data)
+    return config
+
+def normalize_accounts(data):
+    return data if isinstance(data, list) else []
+
+config_store = JsonFileStore(CONFIG_FILE, normalize_config)
+accounts_store = JsonFileStore(ACCOUNTS_FILE, normalize_accounts)
+
+def load_config():
+    return config_store.load()
 
 def save_config(config):
-    with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=4, ensure_ascii=False)
+    config_store.save(config)
 
 def load_accounts():
-    if os.path.exists(ACCOUNTS_FILE):
-        try:
-            with open(ACCOUNTS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return []
-    return []
+    return accounts_store.load()
 
 def save_accounts(accounts):
-    with open(ACCOUNTS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(accounts, f, indent=4, ensure_ascii=False)
+    accounts_store.save(accounts)
 
 def add_offline_account(username):
     accounts = load_accounts()
@@ -223,11 +377,19 @@ def print_help():
 {COLOR_GREEN}бета{COLOR_RESET}        - Показать бета версии
 {COLOR_GREEN}снапшоты{COLOR_RESET}    - Показать снапшоты
 {COLOR_GREEN}релизы{COLOR_RESET}      - Показать релизные версии
-{COLOR_GREEN}установить{COLOR_RESET}  - Установить версию
-{COLOR_GREEN}запуск{COLOR_RESET}      - Запустить Minecraft
+{COLOR_GREEN}установить{COLOR_RESET}  - Установить версию (несколько версий через пробел - параллельно)
+{COLOR_GREEN}проверить{COLOR_RESET}   - Проверить и докачать файлы версии (например: 'проверить 1.20.1')
+{COLOR_GREEN}запуск{COLOR_RESET}      - Запустить Minecraft ('запуск --dry-run' - только показать команду)
+{COLOR_GREEN}игры{COLOR_RESET}        - Список запущенных игр
+{COLOR_GREEN}выход{COLOR_RESET}       - Выйти из лаунчера (запущенные игры можно дождаться, остановить или оставить работать)
+{COLOR_GREEN}стоп{COLOR_RESET}        - Завершить игру (например: 'стоп 1')
+{COLOR_GREEN}убить{COLOR_RESET}       - Принудительно завершить игру (например: 'убить 1')
+{COLOR_GREEN}вывод{COLOR_RESET}       - Вывод игры (например: 'вывод 1 WARN 100' или 'вывод 1 FabricLoader')
 {COLOR_GREEN}арг{COLOR_RESET}         - Настройка аргументов Java
 {COLOR_GREEN}память{COLOR_RESET}      - Установить объем памяти (например: 'память 4')
-{COLOR_GREEN}моды{COLOR_RESET}        - Открыть папку модов
+{COLOR_GREEN}профиль{COLOR_RESET}     - Подобрать память и GC для выбранной версии ('профиль <имя>', 'профиль сброс')
+{COLOR_GREEN}профили{COLOR_RESET}     - Список профилей JVM
+{COLOR_GREEN}моды{COLOR_RESET}        - Открыть папку модов ('моды скан' - дубликаты, модлоадер и зависимости)
 {COLOR_GREEN}ресурспак{COLOR_RESET}   - Открыть папку ресурспаков
 {COLOR_GREEN}миры{COLOR_RESET}        - Открыть папку миров
 {COLOR_GREEN}конфиги{COLOR_RESET}     - Открыть папку конфигов
@@ -235,14 +397,23 @@ def print_help():
 {COLOR_GREEN}инфо{COLOR_RESET}        - Полезная информация
 {COLOR_GREEN}заметка{COLOR_RESET}     - Добавить заметку
 {COLOR_GREEN}заметки{COLOR_RESET}     - Показать все заметки
-{COLOR_GREEN}бэкап{COLOR_RESET}       - Создать резервную копию
+{COLOR_GREEN}бэкап{COLOR_RESET}       - Создать инкрементальную резервную копию ('бэкап zip [1-9]' - ZIP на рабочий стол, число - уровень сжатия)
+{COLOR_GREEN}бэкапы{COLOR_RESET}      - Список резервных копий ('бэкапы очистить' - удалить старые)
+{COLOR_GREEN}восстановить{COLOR_RESET} - Восстановить папку или мир из резервной копии
 {COLOR_GREEN}папка{COLOR_RESET}       - Открыть папку Minecraft
 {COLOR_GREEN}лог{COLOR_RESET}         - Скопировать последний лог на рабочий стол
+{COLOR_GREEN}лог поиск{COLOR_RESET}   - Поиск по логам, включая .log.gz (например: 'лог поиск Exception WARN с=12:00 по=13:00')
 {COLOR_GREEN}джава{COLOR_RESET}       - Установить путь к Java
 {COLOR_GREEN}установить джава{COLOR_RESET} - Скачать и установить Java
+{COLOR_GREEN}джава авто{COLOR_RESET}  - Включить/выключить автовыбор Java по версии игры (Java от Mojang)
 {COLOR_GREEN}краш{COLOR_RESET}        - Скопировать краш-репорты на рабочий стол
+{COLOR_GREEN}краши{COLOR_RESET}       - Самые частые различные краши (например: 'краши 10')
 {COLOR_GREEN}отдельные папки{COLOR_RESET} - Включить/выключить отдельные папки для версий
 {COLOR_GREEN}модлоадеры{COLOR_RESET} - Установка версий с Forge/Fabric
+{COLOR_GREEN}потоки{COLOR_RESET}      - Число потоков загрузки (например: 'потоки 16')
+{COLOR_GREEN}предзагрузка{COLOR_RESET} - Включить/выключить фоновую загрузку данных при запуске
+{COLOR_GREEN}cds{COLOR_RESET}         - Включить/выключить архив классов AppCDS для быстрого запуска ('cds очистить')
+{COLOR_GREEN}прогрев{COLOR_RESET}     - Включить/выключить прогрев файлов игры перед запуском ('прогрев 512' - бюджет в MB)
     """
     print(help_text)
 
@@ -333,22 +504,104 @@ def manage_accounts_scrollable():
         else:
             print(f"{COLOR_RED}Неверный выбор!{COLOR_RESET}")
 
+_manifest_cache = None
+_manifest_lock = threading.Lock()
+
+def build_manifest_index(manifest):
+    index = {version_type: [] for version_type in VERSION_TYPES.values()}
+    for v in manifest.get("versions", []):
+        index.setdefault(v["type"], []).append({
+            "id": v["id"],
+            "type": v["type"],
+            "url": v.get("url"),
+            "sha1": v.get("sha1"),
+            "releaseTime": v.get("releaseTime")
+        })
+    return index
+
+def read_manifest_cache():
+    if not os.path.exists(MANIFEST_CACHE_FILE):
+        return None
+    try:
+        with open(MANIFEST_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if isinstance(cached, dict) and "index" in cached:
+            return cached
+    except (json.JSONDecodeError, OSError):
+        pass
+    return None
+
+def load_version_manifest(force_refresh=False, quiet=False):
+    with _manifest_lock:
+        return _load_version_manifest(force_refresh, quiet)
+
+def _load_version_manifest(force_refresh, quiet):
+    global _manifest_cache
+    
+    cached = _manifest_cache or read_manifest_cache()
+    if cached and not force_refresh and time.time() - cached.get("fetched_at", 0) < MANIFEST_MAX_AGE:
+        _manifest_cache = cached
+        return cached
+    
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    
+    try:
+        response = requests.get(VERSION_MANIFEST_URL, headers=headers, timeout=15)
+        if response.status_code == 304 and cached:
+            cached["fetched_at"] = time.time()
+        else:
+            response.raise_for_status()
+            manifest = response.json()
+            cached = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fetched_at": time.time(),
+                "latest": manifest.get("latest", {}),
+                "index": build_manifest_index(manifest)
+            }
+        write_json_atomic(MANIFEST_CACHE_FILE, cached)
+    except (requests.RequestException, ValueError) as e:
+        if not cached:
+            raise
+        if not quiet:
+            print(f"{COLOR_YELLOW}Нет связи с сервером Mojang ({e}), используется сохраненный список версий{COLOR_RESET}")
+        cached = dict(cached, fetched_at=time.time())
+    
+    _manifest_cache = cached
+    return cached
+
+def get_versions_by_type(manifest_type):
+    manifest = load_version_manifest()
+    versions = list(manifest["index"].get(manifest_type, []))
+    known_ids = {v["id"] for v in versions}
+    
+    try:
+        for v in minecraft_launcher_lib.utils.get_installed_versions(MINECRAFT_DIR):
+            if v["type"] == manifest_type and v["id"] not in known_ids:
+                versions.append({"id": v["id"], "type": v["type"]})
+    except Exception:
+        pass
+    
+    return versions
+
+def find_manifest_version(version):
+    manifest = load_version_manifest()
+    for versions in manifest["index"].values():
+        for v in versions:
+            if v["id"] == version:
+                return v
+    return None
+
 def list_versions_by_type(version_type):
     print(f"{COLOR_CYAN}Получение списка версий...{COLOR_RESET}")
     
     try:
-        versions = minecraft_launcher_lib.utils.get_available_versions(MINECRAFT_DIR)
-        filtered_versions = []
-        
-        for v in versions:
-            if version_type == "alpha" and v['type'] == 'old_alpha':
-                filtered_versions.append(v)
-            elif version_type == "beta" and v['type'] == 'old_beta':
-                filtered_versions.append(v)
-            elif version_type == "snapshot" and v['type'] == 'snapshot':
-                filtered_versions.append(v)
-            elif version_type == "release" and v['type'] == 'release':
-                filtered_versions.append(v)
+        filtered_versions = get_versions_by_type(VERSION_TYPES[version_type])
         
         if not filtered_versions:
             print(f"{COLOR_YELLOW}Версий данного типа не найдено{COLOR_RESET}")
@@ -383,172 +636,752 @@ def get_minecraft_dir_for_version(version):
         return str(Path.home() / f".minecraft_{version}")
     return MINECRAFT_DIR
 
-def install_version(version):
-    print(f"{COLOR_CYAN}Установка версии {version}...{COLOR_RESET}")
+DownloadTask = namedtuple("DownloadTask", ["url", "path", "sha1", "size"])
+
+class DownloadError(Exception):
+    pass
+
+def file_digest(path, algorithm):
+    digest = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def file_sha1(path):
+    return file_digest(path, "sha1")
+
+def get_os_name():
+    system = platform.system()
+    if system == "Windows":
+        return "windows"
+    if system == "Darwin":
+        return "osx"
+    return "linux"
+
+def library_allowed(library):
+    rules = library.get("rules")
+    if not rules:
+        return True
+    
+    allowed = False
+    for rule in rules:
+        os_rule = rule.get("os", {})
+        matches = True
+        if "name" in os_rule and os_rule["name"] != get_os_name():
+            matches = False
+        if os_rule.get("arch") == "x86" and sys.maxsize > 2**32:
+            matches = False
+        if rule.get("features"):
+            matches = False
+        if matches:
+            allowed = rule.get("action") == "allow"
+    return allowed
+
+def maven_path(name):
+    parts = name.split(":")
+    group, artifact, version = parts[0], parts[1], parts[2]
+    classifier = f"-{parts[3]}" if len(parts) > 3 else ""
+    return f"{group.replace('.', '/')}/{artifact}/{version}/{artifact}-{version}{classifier}.jar"
+
+def collect_library_downloads(library, minecraft_dir):
+    tasks = []
+    libraries_dir = os.path.join(minecraft_dir, "libraries")
+    downloads = library.get("downloads")
+    
+    if downloads is None:
+        if "name" in library:
+            path = maven_path(library["name"])
+            base_url = library.get("url") or LIBRARIES_URL
+            tasks.append(DownloadTask(base_url.rstrip("/") + "/" + path, os.path.join(libraries_dir, path), library.get("sha1"), library.get("size")))
+        return tasks
+    
+    artifact = downloads.get("artifact")
+    if artifact and artifact.get("url"):
+        path = artifact.get("path") or maven_path(library["name"])
+        tasks.append(DownloadTask(artifact["url"], os.path.join(libraries_dir, path), artifact.get("sha1"), artifact.get("size")))
+    
+    native_key = library.get("natives", {}).get(get_os_name())
+    if native_key:
+        native_key = native_key.replace("${arch}", "64" if sys.maxsize > 2**32 else "32")
+        native = downloads.get("classifiers", {}).get(native_key)
+        if native and native.get("url"):
+            tasks.append(DownloadTask(native["url"], os.path.join(libraries_dir, native["path"]), native.get("sha1"), native.get("size")))
+    
+    return tasks
+
+def collect_version_downloads(version_data, minecraft_dir):
+    tasks = []
+    version_id = version_data["id"]
+    
+    client = version_data.get("downloads", {}).get("client")
+    if client:
+        jar_path = os.path.join(minecraft_dir, "versions", version_id, f"{version_id}.jar")
+        tasks.append(DownloadTask(client["url"], jar_path, client.get("sha1"), client.get("size")))
+    
+    for library in version_data.get("libraries", []):
+        if library_allowed(library):
+            tasks.extend(collect_library_downloads(library, minecraft_dir))
+    
+    logging_file = version_data.get("logging", {}).get("client", {}).get("file")
+    if logging_file:
+        log_path = os.path.join(minecraft_dir, "assets", "log_configs", logging_file["id"])
+        tasks.append(DownloadTask(logging_file["url"], log_path, logging_file.get("sha1"), logging_file.get("size")))
+    
+    return tasks
+
+def collect_asset_downloads(asset_index, minecraft_dir):
+    tasks = []
+    objects_dir = os.path.join(minecraft_dir, "assets", "objects")
+    for obj in asset_index.get("objects", {}).values():
+        object_hash = obj["hash"]
+        tasks.append(DownloadTask(
+            f"{RESOURCES_URL}/{object_hash[:2]}/{object_hash}",
+            os.path.join(objects_dir, object_hash[:2], object_hash),
+            object_hash,
+            obj.get("size")
+        ))
+    return tasks
+
+def object_store_path(sha1):
+    return os.path.join(OBJECT_STORE_DIR, sha1[:2], sha1)
+
+def link_file(source, target, allow_symlink=True):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp_path = f"{target}.{threading.get_ident()}.link"
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+    
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        if allow_symlink:
+            try:
+                os.symlink(os.path.abspath(source), tmp_path)
+            except OSError:
+                shutil.copy2(source, tmp_path)
+        else:
+            shutil.copy2(source, tmp_path)
+    os.replace(tmp_path, target)
+
+class Downloader:
+    def __init__(self, workers=None, retries=4, use_store=None, allow_symlinks=True):
+        from requests.adapters import HTTPAdapter
+        
+        config = load_config()
+        self.workers = max(1, int(workers or config.get("download_workers", 16)))
+        self.retries = retries
+        self.use_store = config.get("separate_version_dirs", False) if use_store is None else use_store
+        self.allow_symlinks = allow_symlinks
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._active_runs = 0
+        self._reset_progress()
+    
+    def _once(self, key, func):
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = concurrent_futures.Future()
+                self._inflight[key] = future
+        
+        if not owner:
+            return future.result(), False
+        
+        try:
+            result = func()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result, True
+    
+    def _reset_progress(self):
+        self.total_files = 0
+        self.done_files = 0
+        self.total_bytes = 0
+        self.done_bytes = 0
+        self._last_report = 0
+        self._started = time.time()
+    
+    def _advance(self, size=0, files=0):
+        with self._lock:
+            if not self._active_runs:
+                return
+            self.done_bytes += size
+            self.done_files += files
+            now = time.time()
+            if now - self._last_report < 0.2 and self.done_files < self.total_files:
+                return
+            self._last_report = now
+            elapsed = max(now - self._started, 0.001)
+            print(f"\r{COLOR_CYAN}Загрузка: {self.done_files}/{self.total_files} файлов, "
+                  f"{self.done_bytes/1024/1024:.1f}/{self.total_bytes/1024/1024:.1f} MB "
+                  f"({self.done_bytes/1024/1024/elapsed:.1f} MB/s){COLOR_RESET}", end="", flush=True)
+    
+    def is_valid(self, task):
+        if not os.path.isfile(task.path):
+            return False
+        if task.size is not None and os.path.getsize(task.path) != task.size:
+            return False
+        return task.sha1 is None or file_sha1(task.path) == task.sha1
+    
+    def _fetch(self, task):
+        os.makedirs(os.path.dirname(task.path), exist_ok=True)
+        tmp_path = f"{task.path}.{threading.get_ident()}.part"
+        last_error = None
+        
+        for attempt in range(self.retries):
+            received = 0
+            try:
+                with self.session.get(task.url, stream=True, timeout=30) as response:
+                    response.raise_for_status()
+                    sha1 = hashlib.sha1()
+                    with open(tmp_path, 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=65536):
+                            f.write(chunk)
+                            sha1.update(chunk)
+                            received += len(chunk)
+                            self._advance(len(chunk))
+                if task.sha1 and sha1.hexdigest() != task.sha1:
+                    raise DownloadError(f"Неверная контрольная сумма SHA-1: {task.path}")
+                os.replace(tmp_path, task.path)
+                return
+            except (requests.RequestException, DownloadError, OSError) as e:
+                last_error = e
+                self._advance(-received)
+                time.sleep(min(0.5 * 2 ** attempt, 8))
+        
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise DownloadError(f"Не удалось скачать {task.url}: {last_error}")
+    
+    def _download_into_store(self, task):
+        store_path = object_store_path(task.sha1)
+        if os.path.exists(task.path) and os.path.exists(store_path) and os.path.samefile(task.path, store_path):
+            self._advance(task.size or 0, 1)
+            return False
+        
+        downloaded = False
+        if not os.path.isfile(store_path):
+            if self.is_valid(task):
+                link_file(task.path, store_path, allow_symlink=False)
+                self._advance(task.size or 0)
+            else:
+                downloaded, owner = self._once(("object", task.sha1), lambda: self._fetch(task._replace(path=store_path)) or True)
+                if not owner:
+                    self._advance(task.size or 0)
+        else:
+            self._advance(task.size or 0)
+        
+        link_file(store_path, task.path, self.allow_symlinks)
+        self._advance(files=1)
+        return downloaded
+    
+    def download_file(self, task):
+        result, owner = self._once(("file", task.path), lambda: self._download_file(task))
+        if not owner:
+            self._advance(task.size or 0, 1)
+        return result and owner
+    
+    def _download_file(self, task):
+        if self.use_store and task.sha1:
+            return self._download_into_store(task)
+        
+        if self.is_valid(task):
+            self._advance(task.size or 0, 1)
+            return False
+        
+        self._fetch(task)
+        self._advance(files=1)
+        return True
+    
+    def download_json(self, task):
+        self.download_file(task)
+        with open(task.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def run(self, tasks):
+        unique_tasks = list({task.path: task for task in tasks}.values())
+        with self._lock:
+            if self._active_runs == 0:
+                self._reset_progress()
+            self._active_runs += 1
+            self.total_files += len(unique_tasks)
+            self.total_bytes += sum(task.size or 0 for task in unique_tasks)
+        
+        try:
+            return self._run_tasks(unique_tasks)
+        finally:
+            with self._lock:
+                self._active_runs -= 1
+    
+    def _run_tasks(self, unique_tasks):
+        failed = []
+        with concurrent_futures.ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.download_file, task): task for task in unique_tasks}
+            for future in concurrent_futures.as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    failed.append((futures[future], e))
+        
+        if unique_tasks:
+            print()
+        return failed
+
+def prefetch_version_files(version, minecraft_dir, downloader):
+    entry = find_manifest_version(version)
+    if not entry or not entry.get("url"):
+        return False
+    
+    version_dir = os.path.join(minecraft_dir, "versions", version)
+    version_data = downloader.download_json(DownloadTask(entry["url"], os.path.join(version_dir, f"{version}.json"), entry.get("sha1"), None))
+    tasks = collect_version_downloads(version_data, minecraft_dir)
+    
+    asset_index_info = version_data.get("assetIndex")
+    if asset_index_info:
+        index_path = os.path.join(minecraft_dir, "assets", "indexes", f"{asset_index_info['id']}.json")
+        asset_index = downloader.download_json(DownloadTask(asset_index_info["url"], index_path, asset_index_info.get("sha1"), asset_index_info.get("size")))
+        tasks.extend(collect_asset_downloads(asset_index, minecraft_dir))
+    
+    failed = downloader.run(tasks)
+    for task, error in failed[:5]:
+        print(f"{COLOR_RED}{error}{COLOR_RESET}")
+    if failed:
+        print(f"{COLOR_YELLOW}Не скачано файлов: {len(failed)}, они будут загружены повторно при завершении установки{COLOR_RESET}")
+    return True
+
+def install_version_job(version, loader=None, loader_version=None, downloader=None):
+    started = time.perf_counter()
+    result = {
+        "version": version,
+        "loader": loader,
+        "loader_version": loader_version,
+        "installed_version": None,
+        "minecraft_dir": None,
+        "status": "error",
+        "error": None
+    }
     
     try:
         minecraft_dir = get_minecraft_dir_for_version(version)
-        minecraft_launcher_lib.install.install_minecraft_version(version, minecraft_dir)
+        result["minecraft_dir"] = minecraft_dir
+        
+        if loader and not loader_version:
+            loader_versions = get_loader_versions(loader, version)
+            if not loader_versions:
+                raise ValueError(f"{loader} для версии {version} не найден")
+            loader_version = result["loader_version"] = default_loader_version(loader, loader_versions)
+        
+        prefetch_version_files(version, minecraft_dir, downloader or Downloader())
         
+        if loader:
+            result["installed_version"] = install_modloader(loader, version, loader_version, minecraft_dir)
+        else:
+            minecraft_launcher_lib.install.install_minecraft_version(version, minecraft_dir)
+            result["installed_version"] = version
+        result["status"] = "ok"
+    
+    except Exception as e:
+        result["error"] = str(e)
+    
+    result["seconds"] = round(time.perf_counter() - started, 2)
+    return result
+
+def run_install_queue(versions, loader=None, loader_version=None, jobs=2):
+    versions = list(dict.fromkeys(versions))
+    if not versions:
+        return []
+    
+    downloader = Downloader()
+    jobs = max(1, min(jobs, len(versions)))
+    print(f"{COLOR_CYAN}Очередь установки: {len(versions)} верс., параллельно {jobs}, потоков загрузки {downloader.workers}{COLOR_RESET}")
+    
+    with concurrent_futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(lambda version: install_version_job(version, loader, loader_version, downloader), versions))
+    
+    for result in results:
+        name = result["installed_version"] or result["version"]
+        if result["status"] == "ok":
+            print(f"{COLOR_GREEN}{name}: установлено за {result['seconds']}с{COLOR_RESET}")
+        else:
+            print(f"{COLOR_RED}{name}: {result['error']}{COLOR_RESET}")
+    
+    installed = [result["installed_version"] for result in results if result["status"] == "ok"]
+    if installed:
         config = load_config()
-        config["selected_version"] = version
+        config["selected_version"] = installed[-1]
         save_config(config)
+    return results
+
+def install_version(version):
+    print(f"{COLOR_CYAN}Установка версии {version}...{COLOR_RESET}")
+    
+    downloader = Downloader()
+    print(f"{COLOR_CYAN}Параллельная загрузка файлов ({downloader.workers} потоков)...{COLOR_RESET}")
+    result = install_version_job(version, downloader=downloader)
+    
+    if result["status"] != "ok":
+        print(f"{COLOR_RED}Ошибка установки: {result['error']}{COLOR_RESET}")
+        return
+    
+    config = load_config()
+    config["selected_version"] = version
+    save_config(config)
+    
+    print(f"{COLOR_GREEN}Версия {version} успешно установлена!{COLOR_RESET}")
+
+verify_cache_store = JsonFileStore(VERIFY_CACHE_FILE, lambda data: data if isinstance(data, dict) else {})
+
+def collect_installed_files(version, minecraft_dir):
+    tasks = []
+    asset_index_info = None
+    chain = get_version_chain(version, minecraft_dir)
+    for chain_version in chain:
+        with open(os.path.join(minecraft_dir, "versions", chain_version, f"{chain_version}.json"), 'r', encoding='utf-8') as f:
+            version_data = json.load(f)
+        tasks.extend(collect_version_downloads(version_data, minecraft_dir))
+        asset_index_info = asset_index_info or version_data.get("assetIndex")
+    return chain, tasks, asset_index_info
+
+def check_installed_file(task, record):
+    try:
+        stat = os.stat(task.path)
+    except OSError:
+        return "missing", None
+    if task.size is not None and stat.st_size != task.size:
+        return "corrupt", None
+    if task.sha1 is None:
+        return "ok", None
+    
+    current = [stat.st_size, stat.st_mtime_ns, task.sha1]
+    if record == current:
+        return "cached", record
+    return None, current
+
+def hash_installed_file(task, current):
+    try:
+        if file_sha1(task.path) == task.sha1:
+            return "ok", current
+    except OSError:
+        return "missing", None
+    return "corrupt", None
+
+def verify_installed_files(tasks, records):
+    statuses = {}
+    to_hash = []
+    for task in {task.path: task for task in tasks}.values():
+        status, record = check_installed_file(task, records.get(task.path))
+        if status is None:
+            to_hash.append((task, record))
+        else:
+            statuses[task.path] = (task, status)
+            if record is None:
+                records.pop(task.path, None)
+    
+    if to_hash:
+        with concurrent_futures.ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 2)) as pool:
+            hashed = pool.map(lambda item: hash_installed_file(*item), to_hash)
+            for (task, _), (status, record) in zip(to_hash, hashed):
+                statuses[task.path] = (task, status)
+                if record is None:
+                    records.pop(task.path, None)
+                else:
+                    records[task.path] = record
+    
+    return statuses, len(to_hash)
+
+def discard_broken_file(task, use_store):
+    if use_store and task.sha1:
+        store_path = object_store_path(task.sha1)
+        if os.path.isfile(store_path) and file_sha1(store_path) != task.sha1:
+            os.remove(store_path)
+    if os.path.lexists(task.path):
+        os.remove(task.path)
+
+def verify_version(version, repair=True):
+    started = time.perf_counter()
+    minecraft_dir = get_minecraft_dir_for_version(version)
+    result = {"version": version, "checked": 0, "cached": 0, "hashed": 0, "missing": [], "corrupt": [], "repaired": 0, "failed": [], "status": None, "seconds": 0}
+    
+    chain, tasks, asset_index_info = collect_installed_files(version, minecraft_dir)
+    if not chain:
+        raise ValueError(f"Версия {version} не установлена")
+    
+    downloader = Downloader()
+    if asset_index_info:
+        index_path = os.path.join(minecraft_dir, "assets", "indexes", f"{asset_index_info['id']}.json")
+        index_task = DownloadTask(asset_index_info["url"], index_path, asset_index_info.get("sha1"), asset_index_info.get("size"))
+        tasks.append(index_task)
+        if repair:
+            if not downloader.is_valid(index_task):
+                discard_broken_file(index_task, downloader.use_store)
+            tasks.extend(collect_asset_downloads(downloader.download_json(index_task), minecraft_dir))
+        elif os.path.isfile(index_path):
+            with open(index_path, 'r', encoding='utf-8') as f:
+                tasks.extend(collect_asset_downloads(json.load(f), minecraft_dir))
+    
+    records = verify_cache_store.load()
+    statuses, result["hashed"] = verify_installed_files(tasks, records)
+    result["checked"] = len(statuses)
+    
+    broken = []
+    for path, (task, status) in statuses.items():
+        if status == "cached":
+            result["cached"] += 1
+        elif status in ("missing", "corrupt"):
+            result[status].append(path)
+            broken.append(task)
+    
+    if repair and broken:
+        for task in broken:
+            discard_broken_file(task, downloader.use_store)
+        failed = {task.path for task, _ in downloader.run(broken)}
+        for task in broken:
+            if task.path in failed:
+                result["failed"].append(task.path)
+                continue
+            result["repaired"] += 1
+            if task.sha1:
+                stat = os.stat(task.path)
+                records[task.path] = [stat.st_size, stat.st_mtime_ns, task.sha1]
+    
+    verify_cache_store.save(records)
+    result["status"] = "ok" if result["repaired"] == len(broken) else "broken"
+    result["seconds"] = round(time.perf_counter() - started, 2)
+    return result
+
+def check_version(version=None, repair=True):
+    version = version or load_config().get("selected_version")
+    if not version:
+        print(f"{COLOR_RED}Версия не указана{COLOR_RESET}")
+        return None
+    
+    print(f"{COLOR_CYAN}Проверка файлов {version}...{COLOR_RESET}")
+    try:
+        result = verify_version(version, repair)
+    except Exception as e:
+        print(f"{COLOR_RED}Ошибка проверки: {e}{COLOR_RESET}")
+        return None
+    
+    print(f"{COLOR_GREEN}Проверено файлов: {result['checked']} (из кэша: {result['cached']}, хешировано: {result['hashed']}) за {result['seconds']}с{COLOR_RESET}")
+    broken_count = len(result["missing"]) + len(result["corrupt"])
+    if not broken_count:
+        print(f"{COLOR_GREEN}Все файлы в порядке{COLOR_RESET}")
+        return result
+    
+    print(f"{COLOR_YELLOW}Отсутствует: {len(result['missing'])}, повреждено: {len(result['corrupt'])}{COLOR_RESET}")
+    for path in (result["missing"] + result["corrupt"])[:10]:
+        print(f"  {os.path.relpath(path, get_minecraft_dir_for_version(version))}")
+    if repair:
+        print(f"{COLOR_GREEN}Восстановлено: {result['repaired']}{COLOR_RESET}")
+        if result["failed"]:
+            print(f"{COLOR_RED}Не удалось скачать: {len(result['failed'])}{COLOR_RESET}")
+    return result
+
+def set_download_workers(count):
+    if not count.isdigit() or not 1 <= int(count) <= 64:
+        print(f"{COLOR_RED}Укажите число потоков от 1 до 64{COLOR_RESET}")
+        return
+    
+    config = load_config()
+    config["download_workers"] = int(count)
+    save_config(config)
+    print(f"{COLOR_GREEN}Потоков загрузки: {count}{COLOR_RESET}")
+
+MODLOADERS = {
+    "1": ("forge", "Forge"),
+    "2": ("fabric", "Fabric"),
+    "3": ("quilt", "Quilt"),
+    "4": ("neoforge", "NeoForge")
+}
+
+_loader_catalogs = {}
+_loader_catalogs_lock = threading.Lock()
+
+def loader_version_key(loader_version, unstable=()):
+    version = loader_version.split("+")[0]
+    marker = re.search(r'alpha|beta|pre|rc', version, re.IGNORECASE)
+    release = version[:marker.start()] if marker else version
+    prerelease = version[marker.end():] if marker else ""
+    stable = marker is None and loader_version not in unstable
+    return tuple(int(part) for part in re.findall(r'\d+', release)), stable, tuple(int(part) for part in re.findall(r'\d+', prerelease))
+
+def neoforge_minecraft_version(neoforge_version):
+    parts = neoforge_version.split("-")[0].split(".")
+    if len(parts) < 2 or not parts[0].isdigit() or not parts[1].isdigit():
+        return None
+    if int(parts[0]) >= 26:
+        return ".".join(parts[:2]) if len(parts) < 4 or parts[2] == "0" else ".".join(parts[:3])
+    return f"1.{parts[0]}" if parts[1] == "0" else f"1.{parts[0]}.{parts[1]}"
+
+def index_loader_versions(pairs):
+    index = {}
+    for minecraft_version, loader_version in pairs:
+        if minecraft_version:
+            index.setdefault(minecraft_version, []).append(loader_version)
+    for loader_versions in index.values():
+        loader_versions.sort(key=loader_version_key, reverse=True)
+    return index
+
+def fetch_loader_catalog(loader):
+    if loader == "forge":
+        forge_versions = minecraft_launcher_lib.forge.list_forge_versions()
+        return {"index": index_loader_versions((v.split("-", 1)[0], v) for v in forge_versions if "-" in v)}
+    
+    if loader == "neoforge":
+        response = requests.get(NEOFORGE_VERSIONS_URL, timeout=15)
+        response.raise_for_status()
+        versions = response.json().get("versions", [])
+        return {"index": index_loader_versions((neoforge_minecraft_version(v), v) for v in versions)}
+    
+    meta_url = FABRIC_META_URL if loader == "fabric" else QUILT_META_URL
+    games = requests.get(f"{meta_url}/game", timeout=15)
+    games.raise_for_status()
+    loaders = requests.get(f"{meta_url}/loader", timeout=15)
+    loaders.raise_for_status()
+    
+    loader_versions = []
+    unstable = set()
+    for item in loaders.json():
+        loader_data = item.get("loader", item) if isinstance(item, dict) else {}
+        if isinstance(loader_data, dict) and loader_data.get("version"):
+            loader_versions.append(loader_data["version"])
+            if loader_data.get("stable") is False:
+                unstable.add(loader_data["version"])
+    loader_versions.sort(key=lambda loader_version: loader_version_key(loader_version, unstable), reverse=True)
+    return {"games": [game["version"] for game in games.json() if "version" in game], "loaders": loader_versions, "unstable": sorted(unstable)}
+
+def load_loader_catalog(loader, force_refresh=False, quiet=False):
+    with _loader_catalogs_lock:
+        cache_path = os.path.join(LOADER_CACHE_DIR, f"{loader}.json")
+        catalog = _loader_catalogs.get(loader)
+        if catalog is None and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    catalog = json.load(f)
+            except (json.JSONDecodeError, OSError):
+                catalog = None
         
-        print(f"{COLOR_GREEN}Версия {version} успешно установлена!{COLOR_RESET}")
+        ttl = load_config().get("loader_catalog_ttl", 21600)
+        if catalog and not force_refresh and catalog.get("schema") == LOADER_CATALOG_SCHEMA and time.time() - catalog.get("fetched_at", 0) < ttl:
+            _loader_catalogs[loader] = catalog
+            return catalog
         
-    except Exception as e:
-        print(f"{COLOR_RED}Ошибка установки: {e}{COLOR_RESET}")
+        try:
+            fresh = fetch_loader_catalog(loader)
+            fresh["fetched_at"] = time.time()
+            fresh["schema"] = LOADER_CATALOG_SCHEMA
+            write_json_atomic(cache_path, fresh)
+            catalog = fresh
+        except Exception as e:
+            if not catalog:
+                raise
+            if not quiet:
+                print(f"{COLOR_YELLOW}Не удалось обновить список версий {loader} ({e}), используется сохраненный{COLOR_RESET}")
+            catalog = dict(catalog, fetched_at=time.time())
+        
+        _loader_catalogs[loader] = catalog
+        return catalog
+
+def get_loader_versions(loader, minecraft_version):
+    catalog = load_loader_catalog(loader)
+    if "index" in catalog:
+        return catalog["index"].get(minecraft_version, [])
+    return catalog["loaders"] if minecraft_version in catalog.get("games", []) else []
+
+def default_loader_version(loader, loader_versions):
+    unstable = set(load_loader_catalog(loader).get("unstable", []))
+    return next((v for v in loader_versions if loader_version_key(v, unstable)[1]), loader_versions[0])
+
+def choose_loader_version(loader_title, loader_versions, default=None, limit=10):
+    print(f"{COLOR_GREEN}Доступные версии {loader_title}:{COLOR_RESET}")
+    shown = loader_versions[:limit]
+    default = default or shown[0]
+    for i, loader_version in enumerate(shown, 1):
+        print(f"{COLOR_YELLOW}{i}.{COLOR_RESET} {loader_version}")
+    
+    choice = input(f"{COLOR_YELLOW}Выберите версию {loader_title} (1-{len(shown)}, Enter - {default}): {COLOR_RESET}")
+    if not choice:
+        return default
+    if choice.isdigit() and 1 <= int(choice) <= len(shown):
+        return shown[int(choice) - 1]
+    print(f"{COLOR_RED}Неверный выбор{COLOR_RESET}")
+    return None
+
+def install_modloader(loader, minecraft_version, loader_version, minecraft_dir):
+    if loader == "forge":
+        minecraft_launcher_lib.forge.install_forge_version(loader_version, minecraft_dir)
+        return minecraft_launcher_lib.forge.forge_to_installed_version(loader_version)
+    if loader == "fabric":
+        minecraft_launcher_lib.fabric.install_fabric(minecraft_version, minecraft_dir, loader_version)
+        return f"fabric-loader-{loader_version}-{minecraft_version}"
+    if loader == "quilt":
+        minecraft_launcher_lib.quilt.install_quilt(minecraft_version, minecraft_dir, loader_version)
+        return f"quilt-loader-{loader_version}-{minecraft_version}"
+    minecraft_launcher_lib.forge.install_forge_version(loader_version, minecraft_dir)
+    return loader_version
 
 def install_version_with_modloader():
     print(f"{COLOR_CYAN}Установка версии с модлоадером{COLOR_RESET}")
     
     print(f"{COLOR_GREEN}Выберите модлоадер:{COLOR_RESET}")
-    print(f"{COLOR_YELLOW}1.{COLOR_RESET} Forge")
-    print(f"{COLOR_YELLOW}2.{COLOR_RESET} Fabric")
-    print(f"{COLOR_YELLOW}3.{COLOR_RESET} Quilt")
-    print(f"{COLOR_YELLOW}4.{COLOR_RESET} NeoForge")
+    for key, (loader, loader_title) in MODLOADERS.items():
+        print(f"{COLOR_YELLOW}{key}.{COLOR_RESET} {loader_title}")
     
     loader_choice = input(f"{COLOR_YELLOW}Выберите модлоадер: {COLOR_RESET}")
     
-    if loader_choice not in ['1', '2', '3', '4']:
+    if loader_choice not in MODLOADERS:
         print(f"{COLOR_RED}Неверный выбор{COLOR_RESET}")
         return
     
-    version = input(f"{COLOR_YELLOW}Введите версию Minecraft (например, 1.20.1): {COLOR_RESET}")
+    version = input(f"{COLOR_YELLOW}Введите версию Minecraft (например, 1.20.1): {COLOR_RESET}").strip()
     
     if not version:
         print(f"{COLOR_RED}Версия не указана{COLOR_RESET}")
         return
     
+    loader, loader_title = MODLOADERS[loader_choice]
+    
     try:
-        minecraft_dir = get_minecraft_dir_for_version(version)
-        
-        if loader_choice == '1':
-            print(f"{COLOR_CYAN}Установка Forge для {version}...{COLOR_RESET}")
-            
-            try:
-                forge_versions = minecraft_launcher_lib.forge.list_forge_versions()
-                
-                filtered_forge = []
-                for forge_ver in forge_versions:
-                    if version in forge_ver:
-                        filtered_forge.append(forge_ver)
-                
-                if not filtered_forge:
-                    print(f"{COLOR_RED}Forge для версии {version} не найден{COLOR_RESET}")
-                    return
-                
-                print(f"{COLOR_GREEN}Доступные версии Forge:{COLOR_RESET}")
-                for i, forge_ver in enumerate(filtered_forge[:10], 1):
-                    print(f"{COLOR_YELLOW}{i}.{COLOR_RESET} {forge_ver}")
-                
-                forge_choice = input(f"{COLOR_YELLOW}Выберите версию Forge (1-{min(10, len(filtered_forge))}): {COLOR_RESET}")
-                
-                if forge_choice.isdigit():
-                    idx = int(forge_choice) - 1
-                    if 0 <= idx < len(filtered_forge):
-                        forge_version = filtered_forge[idx]
-                        print(f"{COLOR_CYAN}Установка {forge_version}...{COLOR_RESET}")
-                        minecraft_launcher_lib.forge.install_forge_version(forge_version, minecraft_dir)
-                        config = load_config()
-                        config["selected_version"] = forge_version
-                        save_config(config)
-                        print(f"{COLOR_GREEN}Forge {forge_version} успешно установлен!{COLOR_RESET}")
-            except Exception as e:
-                print(f"{COLOR_RED}Ошибка установки Forge: {e}{COLOR_RESET}")
-                return
-        
-        elif loader_choice == '2':
-            print(f"{COLOR_CYAN}Установка Fabric для {version}...{COLOR_RESET}")
-            
-            try:
-                minecraft_launcher_lib.fabric.install_fabric(version, minecraft_dir)
-                fabric_version_id = f"fabric-loader-0.15.11-{version}"
-                
-                config = load_config()
-                config["selected_version"] = fabric_version_id
-                save_config(config)
-                
-                print(f"{COLOR_GREEN}Fabric для Minecraft {version} успешно установлен!{COLOR_RESET}")
-            except Exception as e:
-                print(f"{COLOR_RED}Ошибка установки Fabric: {e}{COLOR_RESET}")
-                return
-        
-        elif loader_choice == '3':
-            print(f"{COLOR_CYAN}Установка Quilt для {version}...{COLOR_RESET}")
-            
-            try:
-                response = requests.get("https://meta.quiltmc.org/v3/versions/loader")
-                if response.status_code == 200:
-                    quilt_versions = response.json()
-                    
-                    latest_loader = None
-                    for item in quilt_versions:
-                        if isinstance(item, dict) and 'loader' in item:
-                            loader_data = item['loader']
-                            if isinstance(loader_data, dict) and 'version' in loader_data:
-                                latest_loader = loader_data['version']
-                                break
-                    
-                    if latest_loader:
-                        minecraft_launcher_lib.fabric.install_fabric(version, minecraft_dir, latest_loader)
-                        quilt_version_id = f"quilt-loader-{latest_loader}-{version}"
-                        
-                        config = load_config()
-                        config["selected_version"] = quilt_version_id
-                        save_config(config)
-                        
-                        print(f"{COLOR_GREEN}Quilt {latest_loader} для Minecraft {version} успешно установлен!{COLOR_RESET}")
-                    else:
-                        print(f"{COLOR_RED}Не удалось получить версию Quilt Loader{COLOR_RESET}")
-                        return
-                else:
-                    print(f"{COLOR_RED}Не удалось получить версии Quilt{COLOR_RESET}")
-                    return
-            except Exception as e:
-                print(f"{COLOR_RED}Ошибка установки Quilt: {e}{COLOR_RESET}")
-                return
+        loader_versions = get_loader_versions(loader, version)
+        if not loader_versions:
+            print(f"{COLOR_RED}{loader_title} для версии {version} не найден{COLOR_RESET}")
+            return
         
-        elif loader_choice == '4':
-            print(f"{COLOR_CYAN}Установка NeoForge для {version}...{COLOR_RESET}")
-            
-            try:
-                response = requests.get("https://maven.neoforged.net/api/maven/versions/releases/net/neoforged/neoforge")
-                if response.status_code == 200:
-                    neoforge_data = response.json()
-                    
-                    if 'versions' in neoforge_data:
-                        filtered_neoforge = []
-                        for v in neoforge_data['versions']:
-                            if version in v:
-                                filtered_neoforge.append(v)
-                        
-                        if filtered_neoforge:
-                            latest_neoforge = filtered_neoforge[-1]
-                            print(f"{COLOR_CYAN}Установка NeoForge {latest_neoforge}...{COLOR_RESET}")
-                            
-                            minecraft_launcher_lib.forge.install_forge_version(latest_neoforge, minecraft_dir)
-                            
-                            config = load_config()
-                            config["selected_version"] = latest_neoforge
-                            save_config(config)
-                            
-                            print(f"{COLOR_GREEN}NeoForge {latest_neoforge} успешно установлен!{COLOR_RESET}")
-                        else:
-                            print(f"{COLOR_RED}NeoForge для версии {version} не найден{COLOR_RESET}")
-                            return
-                    else:
-                        print(f"{COLOR_RED}Не удалось получить версии NeoForge{COLOR_RESET}")
-                        return
-                else:
-                    print(f"{COLOR_RED}Ошибка получения версий NeoForge{COLOR_RESET}")
-                    return
-            except Exception as e:
-                print(f"{COLOR_RED}Ошибка установки NeoForge: {e}{COLOR_RESET}")
-                return
-    
+        loader_version = choose_loader_version(loader_title, loader_versions, default_loader_version(loader, loader_versions))
+        if not loader_version:
+            return
     except Exception as e:
-        print(f"{COLOR_RED}Ошибка установки модлоадера: {e}{COLOR_RESET}")
+        print(f"{COLOR_RED}Ошибка установки {loader_title}: {e}{COLOR_RESET}")
+        return
+    
+    print(f"{COLOR_CYAN}Установка {loader_title} {loader_version} для {version}...{COLOR_RESET}")
+    result = install_version_job(version, loader, loader_version)
+    
+    if result["status"] != "ok":
+        print(f"{COLOR_RED}Ошибка установки {loader_title}: {result['error']}{COLOR_RESET}")
+        return
+    
+    config = load_config()
+    config["selected_version"] = result["installed_version"]
+    save_config(config)
+    
+    print(f"{COLOR_GREEN}{loader_title} {loader_version} для Minecraft {version} успешно установлен!{COLOR_RESET}")
+
+def warn_version_profile(config):
+    version = config.get("selected_version")
+    profile_name = get_version_java_args(config, version)[1]
+    if profile_name:
+        print(f"{COLOR_YELLOW}Для {version} используется профиль JVM {profile_name} ('профиль сброс' - вернуть общие аргументы){COLOR_RESET}")
 
 def set_java_args():
     config = load_config()
@@ -565,6 +1398,7 @@ def set_java_args():
         config["java_args"] = new_args
         save_config(config)
         print(f"{COLOR_GREEN}Аргументы обновлены!{COLOR_RESET}")
+        warn_version_profile(config)
 
 def set_memory(gb):
     if not gb.isdigit():
@@ -592,68 +1426,877 @@ def set_memory(gb):
     config["java_args"] = new_args
     save_config(config)
     print(f"{COLOR_GREEN}Память установлена на {gb}GB{COLOR_RESET}")
+    warn_version_profile(config)
+
+def get_memory_info():
+    system = platform.system()
+    try:
+        if system == "Linux":
+            values = {}
+            with open("/proc/meminfo", 'r') as f:
+                for line in f:
+                    key, value = line.split(":", 1)
+                    values[key] = int(value.split()[0]) // 1024
+            return values.get("MemTotal"), values.get("MemAvailable", values.get("MemFree"))
+        
+        if system == "Windows":
+            import ctypes
+            
+            class MemoryStatus(ctypes.Structure):
+                _fields_ = [("length", ctypes.c_ulong), ("load", ctypes.c_ulong)] + [(name, ctypes.c_ulonglong) for name in ("total", "available", "total_page", "available_page", "total_virtual", "available_virtual", "available_extended")]
+            
+            status = MemoryStatus()
+            status.length = ctypes.sizeof(status)
+            ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status))
+            return status.total // 1024 // 1024, status.available // 1024 // 1024
+        
+        if system == "Darwin":
+            total = int(subprocess.run(["sysctl", "-n", "hw.memsize"], capture_output=True, text=True).stdout)
+            vm_stat = subprocess.run(["vm_stat"], capture_output=True, text=True).stdout
+            page_size = int(re.search(r'page size of (\d+)', vm_stat).group(1))
+            pages = sum(int(count) for count in re.findall(r'Pages (?:free|inactive|speculative):\s+(\d+)', vm_stat))
+            return total // 1024 // 1024, pages * page_size // 1024 // 1024
+    except Exception:
+        pass
+    return None, None
+
+def get_planning_java_major(config, version=None):
+    java_path = config.get("java_path") or shutil.which("java")
+    if version and is_java_auto(config) and get_runtime_platform():
+        minecraft_dir = get_minecraft_dir_for_version(version)
+        required = get_required_java(version, minecraft_dir)
+        if required:
+            java_path = get_runtime_java_path(get_runtime_dir(required[0], minecraft_dir))
+            if java_path is None:
+                return required[1]
+    java_info = get_java_info(java_path) if java_path else None
+    return java_info.get("major") if java_info else None
 
-minecraft_process = None
+def count_mods(version):
+    mods_dir = os.path.join(get_minecraft_dir_for_version(version), "mods")
+    if not os.path.isdir(mods_dir):
+        return 0
+    return sum(1 for name in os.listdir(mods_dir) if name.lower().endswith(".jar"))
 
-def launch_minecraft():
-    global minecraft_process
+def plan_jvm_profile(total_mb, available_mb, cpus, java_major, mod_count):
+    notes = []
+    wanted = 2048 if mod_count == 0 else min(16384, 3072 + mod_count * 16)
+    notes.append(f"модов: {mod_count}, желательный heap {wanted}MB")
     
-    config = load_config()
+    heap_mb = wanted
+    if total_mb:
+        heap_mb = min(heap_mb, int(total_mb * 0.6), total_mb - 2048)
+    if available_mb:
+        heap_mb = min(heap_mb, available_mb - 768)
+    heap_mb = max(1024, heap_mb // 256 * 256)
+    if heap_mb < wanted // 256 * 256:
+        notes.append(f"ограничено памятью: всего {total_mb}MB, свободно {available_mb}MB")
     
-    if not config.get("selected_version"):
+    pretouch = available_mb is not None and available_mb - heap_mb >= 2048 and heap_mb <= 8192
+    min_heap_mb = heap_mb if pretouch else max(512, heap_mb // 2 // 256 * 256)
+    args = [f"-Xmx{heap_mb}M", f"-Xms{min_heap_mb}M"]
+    
+    if java_major and java_major >= 21 and heap_mb >= 8192 and cpus >= 8:
+        gc = "ZGC"
+        args.append("-XX:+UseZGC")
+        if java_major < 23:
+            args.append("-XX:+ZGenerational")
+        notes.append(f"Java {java_major}, большой heap, ядер: {cpus} - поколенческий ZGC")
+    else:
+        gc = "G1"
+        region_mb = 4 if heap_mb <= 4096 else 8 if heap_mb < 12288 else 16
+        pause_ms = 50 if cpus >= 4 else 100
+        args += ["-XX:+UseG1GC", f"-XX:MaxGCPauseMillis={pause_ms}", f"-XX:G1HeapRegionSize={region_mb}M", "-XX:+ParallelRefProcEnabled", "-XX:+DisableExplicitGC"]
+        notes.append(f"G1: регион {region_mb}MB, цель паузы {pause_ms}мс (ядер: {cpus})")
+    
+    if pretouch:
+        args.append("-XX:+AlwaysPreTouch")
+        notes.append("памяти достаточно - heap выделяется заранее (AlwaysPreTouch)")
+    
+    return {
+        "heap_mb": heap_mb,
+        "min_heap_mb": min_heap_mb,
+        "gc": gc,
+        "args": " ".join(args),
+        "notes": notes
+    }
+
+def get_version_java_args(config, version):
+    profile_name = config.get("version_profiles", {}).get(version)
+    profile = config.get("jvm_profiles", {}).get(profile_name)
+    if profile:
+        return profile["args"], profile_name
+    return config.get("java_args", ""), None
+
+def format_heap_size(java_args):
+    match = re.search(r'-Xmx(\d+)([GgMm])', java_args)
+    if not match:
+        return "2GB (по умолчанию)"
+    return f"{match.group(1)}{match.group(2).upper()}B"
+
+def plan_jvm_profile_command(args):
+    config = load_config()
+    version = config.get("selected_version")
+    profiles = config.get("jvm_profiles", {})
+    bindings = config.get("version_profiles", {})
+    
+    if not version:
+        print(f"{COLOR_RED}Сначала выберите версию{COLOR_RESET}")
+        return
+    
+    if args and args[0].lower() in ('сброс', 'reset'):
+        if bindings.pop(version, None):
+            save_config(config)
+            print(f"{COLOR_GREEN}Для {version} снова используются общие аргументы Java{COLOR_RESET}")
+        else:
+            print(f"{COLOR_YELLOW}Для {version} профиль не назначен{COLOR_RESET}")
+        return
+    
+    if args:
+        name = " ".join(args)
+        if name not in profiles:
+            print(f"{COLOR_RED}Профиль {name} не найден{COLOR_RESET}")
+            return
+        bindings[version] = name
+        save_config(config)
+        print(f"{COLOR_GREEN}Профиль {name} назначен версии {version}{COLOR_RESET}")
+        return
+    
+    total_mb, available_mb = get_memory_info()
+    cpus = os.cpu_count() or 1
+    java_major = get_planning_java_major(config, version)
+    mod_count = count_mods(version)
+    plan = plan_jvm_profile(total_mb, available_mb, cpus, java_major, mod_count)
+    
+    print(f"{COLOR_CYAN}ПРОФИЛЬ JVM ДЛЯ {version}{COLOR_RESET}")
+    print(f"{COLOR_GREEN}Память:{COLOR_RESET} всего {total_mb or '?'}MB, свободно {available_mb or '?'}MB, ядер: {cpus}, Java: {java_major or '?'}")
+    for note in plan["notes"]:
+        print(f"  - {note}")
+    print(f"{COLOR_GREEN}Аргументы:{COLOR_RESET} {plan['args']}")
+    
+    name = input(f"{COLOR_YELLOW}Имя профиля (Enter - {version}, '-' - не сохранять): {COLOR_RESET}").strip() or version
+    if name == "-":
+        return
+    
+    profiles[name] = {
+        "args": plan["args"],
+        "heap_mb": plan["heap_mb"],
+        "gc": plan["gc"],
+        "mods": mod_count,
+        "created_at": datetime.now().isoformat()
+    }
+    bindings[version] = name
+    config["jvm_profiles"] = profiles
+    config["version_profiles"] = bindings
+    save_config(config)
+    print(f"{COLOR_GREEN}Профиль {name} сохранен и будет применяться при запуске {version}{COLOR_RESET}")
+
+def show_jvm_profiles():
+    config = load_config()
+    profiles = config.get("jvm_profiles", {})
+    if not profiles:
+        print(f"{COLOR_YELLOW}Профилей JVM пока нет, создайте командой 'профиль'{COLOR_RESET}")
+        return
+    
+    print(f"{COLOR_CYAN}ПРОФИЛИ JVM{COLOR_RESET}")
+    for name, profile in profiles.items():
+        versions = [version for version, bound in config.get("version_profiles", {}).items() if bound == name]
+        print(f"{COLOR_YELLOW}{name}{COLOR_RESET} ({profile.get('gc')}, {profile.get('heap_mb')}MB) - {', '.join(versions) or 'не назначен'}")
+        print(f"  {profile['args']}")
+
+java_registry_store = JsonFileStore(JAVA_REGISTRY_FILE, lambda data: data if isinstance(data, dict) else {})
+java_registry_lock = threading.Lock()
+
+def parse_java_major(version_string):
+    match = re.match(r'(\d+)(?:\.(\d+))?', version_string or "")
+    if not match:
+        return None
+    major = int(match.group(1))
+    if major == 1 and match.group(2):
+        major = int(match.group(2))
+    return major
+
+def probe_java(java_path):
+    try:
+        result = subprocess.run([java_path, "-XshowSettings:properties", "-version"], capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    
+    output = result.stderr or result.stdout
+    properties = dict(re.findall(r'^\s+(java\.version|java\.vendor|os\.arch) = (.*)$', output, re.MULTILINE))
+    version_string = properties.get("java.version")
+    if not version_string:
+        version_match = re.search(r'version "([^"]+)"', output)
+        if not version_match:
+            return None
+        version_string = version_match.group(1)
+    
+    return {
+        "version": version_string.strip(),
+        "major": parse_java_major(version_string),
+        "vendor": properties.get("java.vendor", "").strip() or None,
+        "arch": properties.get("os.arch", "").strip() or None
+    }
+
+def get_java_info(java_path):
+    real_path = os.path.realpath(java_path)
+    try:
+        stat = os.stat(real_path)
+    except OSError:
+        return None
+    
+    entry = java_registry_store.load().get(real_path)
+    if entry and entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+        return entry
+    
+    entry = probe_java(real_path)
+    if entry is None:
+        return None
+    entry.update({"path": real_path, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size})
+    
+    with java_registry_lock:
+        registry = java_registry_store.load()
+        registry[real_path] = entry
+        java_registry_store.save(registry)
+    return entry
+
+def find_java_candidates():
+    import glob
+    
+    binary = "java.exe" if platform.system() == "Windows" else "java"
+    patterns = [
+        os.path.join(JAVA_DIR, "java_*", "bin", binary),
+        os.path.join(JAVA_DIR, "java_*", "*", "bin", binary),
+        os.path.join(JAVA_DIR, "java_*", "*", "Contents", "Home", "bin", binary)
+    ]
+    if platform.system() == "Windows":
+        for root in [os.environ.get("ProgramFiles", r"C:\Program Files"), os.environ.get("ProgramFiles(x86)", r"C:\Program Files (x86)")]:
+            for vendor in ["Java", "Eclipse Adoptium", "Microsoft", "Zulu", "BellSoft"]:
+                patterns.append(os.path.join(root, vendor, "*", "bin", binary))
+    elif platform.system() == "Darwin":
+        patterns.append("/Library/Java/JavaVirtualMachines/*/Contents/Home/bin/java")
+    else:
+        patterns.extend(["/usr/lib/jvm/*/bin/java", "/usr/lib64/jvm/*/bin/java", "/opt/java/*/bin/java"])
+    
+    candidates = []
+    configured = load_config().get("java_path")
+    if configured:
+        candidates.append(configured)
+    for pattern in patterns:
+        candidates.extend(sorted(glob.glob(pattern)))
+    system_java = shutil.which("java")
+    if system_java:
+        candidates.append(system_java)
+    
+    unique = {}
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            unique.setdefault(os.path.realpath(candidate), candidate)
+    return list(unique)
+
+def discover_java_runtimes():
+    candidates = find_java_candidates()
+    if not candidates:
+        return []
+    
+    with concurrent_futures.ThreadPoolExecutor(max_workers=min(8, len(candidates))) as pool:
+        runtimes = list(pool.map(get_java_info, candidates))
+    return [runtime for runtime in runtimes if runtime]
+
+def format_java_runtime(runtime):
+    details = ", ".join(part for part in [runtime.get("vendor"), runtime.get("arch")] if part)
+    return f"Java {runtime['version']} ({details}) - {runtime['path']}" if details else f"Java {runtime['version']} - {runtime['path']}"
+
+launch_cache_store = JsonFileStore(LAUNCH_CACHE_FILE, lambda data: data if isinstance(data, dict) else {})
+
+def get_version_chain(version, minecraft_dir):
+    chain = []
+    current = version
+    while current and current not in chain:
+        json_path = os.path.join(minecraft_dir, "versions", current, f"{current}.json")
+        if not os.path.exists(json_path):
+            break
+        chain.append(current)
+        with open(json_path, 'r', encoding='utf-8') as f:
+            current = json.load(f).get("inheritsFrom")
+    return chain
+
+def get_launch_dependencies(version, minecraft_dir, command):
+    paths = []
+    for chain_version in get_version_chain(version, minecraft_dir):
+        version_dir = os.path.join(minecraft_dir, "versions", chain_version)
+        paths.append(os.path.join(version_dir, f"{chain_version}.json"))
+        paths.append(os.path.join(version_dir, f"{chain_version}.jar"))
+    
+    if "-cp" in command:
+        classpath = command[command.index("-cp") + 1]
+        paths.extend(entry for entry in classpath.split(os.pathsep) if entry)
+    
+    return {path: os.stat(path).st_mtime_ns for path in dict.fromkeys(paths) if os.path.exists(path)}
+
+def launch_dependencies_changed(dependencies):
+    for path, mtime_ns in dependencies.items():
+        try:
+            if os.stat(path).st_mtime_ns != mtime_ns:
+                return True
+        except OSError:
+            return True
+    return False
+
+def get_launch_command(version, minecraft_dir, account, options, java_executable, java_args):
+    cache_key = hashlib.sha1(json.dumps(
+        [version, os.path.abspath(minecraft_dir), account.get("id"), account.get("username"), account.get("type"), java_executable, java_args],
+        ensure_ascii=False
+    ).encode('utf-8')).hexdigest()
+    
+    cache = launch_cache_store.load()
+    entry = cache.get(cache_key)
+    if entry and entry.get("dependencies") and not launch_dependencies_changed(entry["dependencies"]):
+        return entry["command"], True
+    
+    minecraft_command = minecraft_launcher_lib.command.get_minecraft_command(version, minecraft_dir, options)
+    command = [java_executable] + java_args + minecraft_command[1:]
+    
+    cache = launch_cache_store.load()
+    cache[cache_key] = {
+        "version": version,
+        "minecraft_dir": minecraft_dir,
+        "command": command,
+        "dependencies": get_launch_dependencies(version, minecraft_dir, command),
+        "created_at": datetime.now().isoformat()
+    }
+    for key in sorted(cache, key=lambda key: cache[key].get("created_at", ""))[:-LAUNCH_CACHE_LIMIT]:
+        del cache[key]
+    launch_cache_store.save(cache)
+    return command, False
+
+def format_command(command):
+    if platform.system() == "Windows":
+        return subprocess.list2cmdline(command)
+    import shlex
+    return shlex.join(command)
+
+LOG_LEVELS = ["TRACE", "DEBUG", "INFO", "WARN", "ERROR", "FATAL"]
+LOG_LINE_PATTERN = re.compile(r'^\[[^\]]*\] \[(?P<thread>[^\]]*?)/(?P<level>[A-Z]+)\](?: \[(?P<logger>[^\]]*?)/?\]| \((?P<logger2>[^)]*)\))?')
+CRASH_MARKERS = [
+    "---- Minecraft Crash Report ----",
+    "#@!@# Game crashed!",
+    "# A fatal error has been detected by the Java Runtime Environment",
+    "hs_err_pid"
+]
+
+class RotatingLogWriter:
+    def __init__(self, path, max_bytes=GAME_LOG_MAX_BYTES, backups=GAME_LOG_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        self._size = self._file.tell()
+    
+    def write(self, line):
+        if self._size + len(line) > self.max_bytes:
+            self._rotate()
+        self._file.write(line)
+        self._size += len(line)
+    
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._size = 0
+    
+    def flush(self):
+        self._file.flush()
+    
+    def close(self):
+        self._file.close()
+
+GAME_LOG_RELAY_SCRIPT = """
+import os, sys, threading
+lock = threading.Lock()
+log = open(sys.argv[1], "ab", buffering=0)
+def pump(handle):
+    if os.name == "nt":
+        import msvcrt
+        handle = msvcrt.open_osfhandle(int(handle), os.O_RDONLY)
+    with os.fdopen(int(handle), "rb") as stream:
+        for line in iter(stream.readline, b""):
+            with lock:
+                log.write(line)
+threads = [threading.Thread(target=pump, args=(handle,)) for handle in sys.argv[2:]]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+"""
+
+def start_log_relay(log_path, streams):
+    fds = [stream.fileno() for stream in streams]
+    if os.name == "nt":
+        import msvcrt
+        handles = [msvcrt.get_osfhandle(fd) for fd in fds]
+        for handle in handles:
+            os.set_handle_inheritable(handle, True)
+        startupinfo = subprocess.STARTUPINFO(lpAttributeList={"handle_list": handles})
+        return subprocess.Popen([sys.executable, "-c", GAME_LOG_RELAY_SCRIPT, log_path] + [str(handle) for handle in handles],
+                                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, close_fds=True, startupinfo=startupinfo,
+                                creationflags=subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP)
+    return subprocess.Popen([sys.executable, "-c", GAME_LOG_RELAY_SCRIPT, log_path] + [str(fd) for fd in fds],
+                            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, pass_fds=fds, start_new_session=True)
+
+class GameOutput:
+    def __init__(self, log_path, max_lines=GAME_OUTPUT_LINES, menu_callback=None):
+        self.lines = deque(maxlen=max_lines)
+        self.log_path = log_path
+        self.crash_line = None
+        self.started = time.perf_counter()
+        self.menu_seconds = None
+        self.menu_callback = menu_callback
+        self._lock = threading.Lock()
+        self._writer = RotatingLogWriter(log_path)
+        self._open_streams = 0
+        self._streams = []
+        self._closed = threading.Event()
+        self._last_level = {}
+    
+    def attach(self, stream, name):
+        with self._lock:
+            self._open_streams += 1
+            self._streams.append(stream)
+        thread = threading.Thread(target=self._read, args=(stream, name), name=f"game-{name}", daemon=True)
+        thread.start()
+    
+    def _read(self, stream, name):
+        try:
+            for raw_line in iter(stream.readline, b''):
+                self._add(name, raw_line.decode('utf-8', errors='replace').rstrip('\r\n'))
+        finally:
+            stream.close()
+            with self._lock:
+                self._open_streams -= 1
+                self._writer.flush()
+                if self._open_streams == 0:
+                    self._writer.close()
+                    self._closed.set()
+    
+    def wait_closed(self, timeout=None):
+        return self._closed.wait(timeout)
+    
+    def detach(self):
+        with self._lock:
+            self._writer.flush()
+            streams = [stream for stream in self._streams if not stream.closed]
+        if streams:
+            start_log_relay(self.log_path, streams)
+        with self._lock:
+            self._writer.flush()
+    
+    def _add(self, stream_name, text):
+        match = LOG_LINE_PATTERN.match(text)
+        if match:
+            level = match.group("level")
+            logger = match.group("logger") or match.group("logger2") or match.group("thread")
+            self._last_level[stream_name] = (level, logger)
+        else:
+            level, logger = self._last_level.get(stream_name, ("ERROR" if stream_name == "stderr" else "INFO", None))
+        
+        crash = self.crash_line is None and any(marker in text for marker in CRASH_MARKERS)
+        menu = self.menu_seconds is None and any(marker in text for marker in MENU_MARKERS)
+        with self._lock:
+            self.lines.append((stream_name, level, logger, text))
+            self._writer.write(text + "\n")
+            if crash:
+                self.crash_line = text
+            if menu:
+                self.menu_seconds = time.perf_counter() - self.started
+        if crash:
+            self.on_crash(text)
+        if menu:
+            self.on_menu(self.menu_seconds)
+    
+    def on_crash(self, text):
+        print(f"\n{COLOR_RED}Обнаружен краш игры: {text.strip()}{COLOR_RESET}")
+        print(f"{COLOR_YELLOW}Полный вывод: {self.log_path}{COLOR_RESET}")
+    
+    def on_menu(self, seconds):
+        print(f"\n{COLOR_GREEN}Главное меню загружено за {seconds:.1f}с{COLOR_RESET}")
+        if self.menu_callback:
+            self.menu_callback(seconds)
+    
+    def tail(self, count=50, min_level=None, logger=None):
+        with self._lock:
+            lines = list(self.lines)
+        
+        if min_level:
+            min_index = LOG_LEVELS.index(min_level)
+            lines = [line for line in lines if line[1] in LOG_LEVELS and LOG_LEVELS.index(line[1]) >= min_index]
+        if logger:
+            lines = [line for line in lines if line[2] and logger.lower() in line[2].lower()]
+        return lines[-count:]
+
+class GameInstance:
+    def __init__(self, instance_id, process, version, username, minecraft_dir, output=None):
+        self.id = instance_id
+        self.process = process
+        self.version = version
+        self.username = username
+        self.minecraft_dir = minecraft_dir
+        self.output = output
+        self.started_at = datetime.now()
+        self.ended_at = None
+        self.exit_code = None
+    
+    @property
+    def running(self):
+        return self.exit_code is None
+
+class GameSupervisor:
+    def __init__(self, poll_interval=0.5):
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._instances = {}
+        self._next_id = 1
+        self._thread = None
+    
+    def start(self, command, version, username, minecraft_dir, menu_callback=None):
+        if os.name == "nt":
+            session = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+        else:
+            session = {"start_new_session": True}
+        process = subprocess.Popen(command, cwd=minecraft_dir, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **session)
+        with self._lock:
+            safe_version = re.sub(r'[^\w.\-]', '_', version)
+            log_path = os.path.join(GAME_LOGS_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{safe_version}_{self._next_id}.log")
+            output = GameOutput(log_path, menu_callback=menu_callback)
+            output.attach(process.stdout, "stdout")
+            output.attach(process.stderr, "stderr")
+            instance = GameInstance(self._next_id, process, version, username, minecraft_dir, output)
+            self._instances[instance.id] = instance
+            self._next_id += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._watch, name="game-supervisor", daemon=True)
+                self._thread.start()
+        return instance
+    
+    def _watch(self):
+        while True:
+            with self._lock:
+                running = [instance for instance in self._instances.values() if instance.running]
+                if not running:
+                    self._thread = None
+                    return
+            
+            for instance in running:
+                exit_code = instance.process.poll()
+                if exit_code is not None:
+                    instance.exit_code = exit_code
+                    instance.ended_at = datetime.now()
+                    self.on_exit(instance)
+            
+            time.sleep(self.poll_interval)
+    
+    def on_exit(self, instance):
+        color = COLOR_GREEN if instance.exit_code == 0 else COLOR_RED
+        print(f"\n{color}Minecraft #{instance.id} ({instance.version}) завершил работу, код {instance.exit_code}{COLOR_RESET}")
+    
+    def instances(self):
+        with self._lock:
+            return list(self._instances.values())
+    
+    def get(self, instance_id):
+        with self._lock:
+            return self._instances.get(instance_id)
+    
+    def stop(self, instance_id, force=False):
+        instance = self.get(instance_id)
+        if instance is None or not instance.running:
+            return False
+        if force:
+            instance.process.kill()
+        else:
+            instance.process.terminate()
+        return True
+
+game_supervisor = GameSupervisor()
+
+cds_index_store = JsonFileStore(CDS_INDEX_FILE, lambda data: data if isinstance(data, dict) else {})
+
+def get_command_option(command, *names):
+    for name in names:
+        if name in command[:-1]:
+            return command[command.index(name) + 1]
+    return ""
+
+def get_cds_key(command, version, minecraft_dir, java_info):
+    mods = []
+    mods_dir = os.path.join(minecraft_dir, "mods")
+    if os.path.isdir(mods_dir):
+        with os.scandir(mods_dir) as it:
+            mods = sorted([entry.name, entry.stat().st_size, entry.stat().st_mtime_ns] for entry in it if entry.name.lower().endswith(".jar"))
+    
+    payload = [
+        version,
+        java_info["path"],
+        java_info.get("version"),
+        java_info.get("mtime_ns"),
+        get_command_option(command, "-cp", "-classpath", "--class-path"),
+        get_command_option(command, "-p", "--module-path"),
+        mods
+    ]
+    return hashlib.sha1(json.dumps(payload).encode('utf-8')).hexdigest()[:20]
+
+def prepare_appcds(command, version, minecraft_dir, dry_run=False):
+    java_info = get_java_info(shutil.which(command[0]) or command[0])
+    if not java_info or (java_info.get("major") or 0) < CDS_MIN_JAVA:
+        print(f"{COLOR_YELLOW}AppCDS требует Java {CDS_MIN_JAVA}+, запуск без архива классов{COLOR_RESET}")
+        return command, None, None
+    
+    key = get_cds_key(command, version, minecraft_dir, java_info)
+    archive_path = os.path.join(CDS_DIR, f"{key}.jsa")
+    if os.path.isfile(archive_path):
+        mode, flag = "use", f"-XX:SharedArchiveFile={archive_path}"
+    else:
+        mode, flag = "record", f"-XX:ArchiveClassesAtExit={archive_path}"
+    
+    if not dry_run:
+        os.makedirs(CDS_DIR, exist_ok=True)
+        index = cds_index_store.load()
+        entry = index.setdefault(key, {"version": version, "java": java_info["path"], "created_at": datetime.now().isoformat()})
+        entry["used_at"] = datetime.now().isoformat()
+        
+        for old_key in sorted(index, key=lambda k: index[k].get("used_at", ""), reverse=True)[CDS_ARCHIVE_LIMIT:]:
+            old_path = os.path.join(CDS_DIR, f"{old_key}.jsa")
+            if os.path.exists(old_path):
+                os.remove(old_path)
+            del index[old_key]
+        cds_index_store.save(index)
+    
+    return [command[0], flag] + command[1:], key, mode
+
+def record_menu_time(key, mode, seconds):
+    index = cds_index_store.load()
+    entry = index.get(key)
+    if entry is None:
+        return
+    
+    field = "baseline_seconds" if mode == "record" else "cds_seconds"
+    entry[field] = round(seconds, 2)
+    cds_index_store.save(index)
+    
+    baseline = entry.get("baseline_seconds")
+    if mode == "use" and baseline:
+        speedup = (baseline - seconds) / baseline * 100
+        print(f"{COLOR_GREEN}С AppCDS: {seconds:.1f}с, без архива: {baseline:.1f}с ({abs(speedup):.0f}% {'быстрее' if speedup >= 0 else 'медленнее'}){COLOR_RESET}")
+
+def toggle_appcds(args):
+    if args and args[0].lower() in ('очистить', 'clear'):
+        shutil.rmtree(CDS_DIR, ignore_errors=True)
+        print(f"{COLOR_GREEN}Архивы AppCDS удалены{COLOR_RESET}")
+        return
+    
+    config = load_config()
+    config["appcds"] = not config.get("appcds", False)
+    save_config(config)
+    
+    status = "включен" if config["appcds"] else "выключен"
+    print(f"{COLOR_CYAN}AppCDS: {COLOR_GREEN}{status}{COLOR_RESET}")
+    if config["appcds"]:
+        print(f"{COLOR_YELLOW}Первый запуск версии запишет архив классов при выходе из игры, следующие запуски будут использовать его.{COLOR_RESET}")
+    
+    for key, entry in cds_index_store.load().items():
+        timings = []
+        if entry.get("baseline_seconds"):
+            timings.append(f"без архива {entry['baseline_seconds']}с")
+        if entry.get("cds_seconds"):
+            timings.append(f"с архивом {entry['cds_seconds']}с")
+        archive = "есть" if os.path.isfile(os.path.join(CDS_DIR, f"{key}.jsa")) else "не записан"
+        print(f"{COLOR_YELLOW}{entry['version']}{COLOR_RESET} [{key[:8]}] архив {archive}; {', '.join(timings) or 'нет замеров'}")
+
+_libc = None
+
+def get_libc():
+    global _libc
+    if _libc is None:
+        try:
+            _libc = ctypes.CDLL(None, use_errno=True) if platform.system() != "Windows" else False
+        except OSError:
+            _libc = False
+    return _libc or None
+
+def file_resident_fraction(path, size):
+    libc = get_libc()
+    if libc is None or not hasattr(libc, "mincore") or size == 0:
+        return None
+    
+    pages = (size + mmap.PAGESIZE - 1) // mmap.PAGESIZE
+    vec = (ctypes.c_ubyte * pages)()
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY) as mm:
+        buffer = ctypes.c_char.from_buffer(mm)
+        try:
+            result = libc.mincore(ctypes.c_void_p(ctypes.addressof(buffer)), ctypes.c_size_t(size), vec)
+        finally:
+            del buffer
+    if result != 0:
+        return None
+    return 1 - bytes(vec).count(0) / pages
+
+def warm_file(path):
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        else:
+            while os.read(fd, 1024 * 1024):
+                pass
+    finally:
+        os.close(fd)
+
+def collect_warmup_files(command, version, minecraft_dir):
+    paths = []
+    for option in (("-cp", "-classpath", "--class-path"), ("-p", "--module-path")):
+        paths.extend(entry for entry in get_command_option(command, *option).split(os.pathsep) if entry)
+    
+    for arg in command:
+        if arg.startswith("-Djava.library.path="):
+            for root, dirs, files in os.walk(arg.split("=", 1)[1]):
+                paths.extend(os.path.join(root, f) for f in files)
+    
+    asset_index_info = collect_installed_files(version, minecraft_dir)[2]
+    if asset_index_info:
+        index_path = os.path.join(minecraft_dir, "assets", "indexes", f"{asset_index_info['id']}.json")
+        if os.path.isfile(index_path):
+            paths.append(index_path)
+            with open(index_path, 'r', encoding='utf-8') as f:
+                paths.extend(task.path for task in collect_asset_downloads(json.load(f), minecraft_dir))
+    
+    return list(dict.fromkeys(paths))
+
+def warm_game_files(command, version, minecraft_dir, budget_mb):
+    started = time.perf_counter()
+    available_mb = get_memory_info()[1]
+    if available_mb:
+        budget_mb = min(budget_mb, available_mb // 4)
+    budget = budget_mb * 1024 * 1024
+    
+    result = {"files": 0, "bytes": 0, "resident": 0, "over_budget": 0, "seconds": 0}
+    selected = []
+    for path in collect_warmup_files(command, version, minecraft_dir):
+        try:
+            size = os.path.getsize(path)
+            fraction = file_resident_fraction(path, size)
+        except (OSError, ValueError):
+            continue
+        if fraction is not None and fraction >= WARMUP_RESIDENT_FRACTION:
+            result["resident"] += 1
+        elif result["bytes"] + size > budget:
+            result["over_budget"] += 1
+        else:
+            selected.append(path)
+            result["bytes"] += size
+    
+    if selected:
+        with concurrent_futures.ThreadPoolExecutor(max_workers=8) as pool:
+            for _ in pool.map(warm_file, selected):
+                pass
+    result["files"] = len(selected)
+    result["seconds"] = round(time.perf_counter() - started, 2)
+    return result
+
+def start_warmup(command, version, minecraft_dir, budget_mb):
+    def run():
+        try:
+            result = warm_game_files(command, version, minecraft_dir, budget_mb)
+        except Exception as e:
+            print(f"\n{COLOR_YELLOW}Прогрев файлов не удался: {e}{COLOR_RESET}")
+            return
+        if not result["files"]:
+            print(f"\n{COLOR_GREEN}Файлы игры уже в кэше ОС, прогрев пропущен{COLOR_RESET}")
+            return
+        print(f"\n{COLOR_GREEN}Прогрев: {result['files']} файлов, {result['bytes'] / 1024 / 1024:.0f}MB за {result['seconds']}с "
+              f"(уже в памяти: {result['resident']}, сверх бюджета: {result['over_budget']}){COLOR_RESET}")
+    
+    thread = threading.Thread(target=run, name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+def toggle_warmup(args):
+    config = load_config()
+    if args:
+        if not args[0].isdigit() or int(args[0]) < 16:
+            print(f"{COLOR_RED}Укажите бюджет в мегабайтах, например: 'прогрев 512'{COLOR_RESET}")
+            return
+        config["warmup_budget_mb"] = int(args[0])
+        config["warmup"] = True
+    else:
+        config["warmup"] = not config.get("warmup", False)
+    save_config(config)
+    
+    status = "включен" if config["warmup"] else "выключен"
+    print(f"{COLOR_CYAN}Прогрев файлов перед запуском: {COLOR_GREEN}{status}{COLOR_RESET} (бюджет {config.get('warmup_budget_mb', 512)}MB)")
+
+def find_account(accounts, reference):
+    return next((a for a in accounts if str(a["id"]) == str(reference)), None) or next((a for a in accounts if a["username"].lower() == str(reference).lower()), None)
+
+def launch_minecraft(dry_run=False, version=None, account_ref=None, interactive=True):
+    config = load_config()
+    version = version or config.get("selected_version")
+    
+    if not version:
         print(f"{COLOR_RED}Сначала установите версию Minecraft!{COLOR_RESET}")
         print(f"{COLOR_YELLOW}Используйте команду 'установить' для выбора версии{COLOR_RESET}")
-        return
+        return None
     
     accounts = load_accounts()
-    current_account_id = config.get("current_account")
+    current_account_id = account_ref or config.get("current_account")
     
-    if not current_account_id or not any(a["id"] == current_account_id for a in accounts):
+    if not current_account_id or not accounts:
         print(f"{COLOR_RED}Сначала настройте аккаунт!{COLOR_RESET}")
         print(f"{COLOR_YELLOW}Используйте команду 'акк' для управления аккаунтами{COLOR_RESET}")
-        return
+        return None
     
-    account = next((a for a in accounts if a["id"] == current_account_id), None)
+    account = find_account(accounts, current_account_id)
     if not account:
         print(f"{COLOR_RED}Аккаунт не найден!{COLOR_RESET}")
-        return
+        return None
     
-    version = config["selected_version"]
     username = account["username"]
     minecraft_dir = get_minecraft_dir_for_version(version)
     
     java_path = config.get("java_path")
-    if java_path and os.path.exists(java_path):
+    required = None
+    if is_java_auto(config):
         try:
-            result = subprocess.run([java_path, "-version"], capture_output=True, text=True, shell=True)
-            java_version_output = result.stderr or result.stdout
-            
-            version_match = re.search(r'version "(\d+)', java_version_output)
-            if version_match:
-                java_version = int(version_match.group(1))
-                print(f"{COLOR_GREEN}Найдена Java версии: {java_version}{COLOR_RESET}")
-                
-                mc_version_match = re.match(r'(\d+)\.(\d+)\.(\d+)', version)
-                if mc_version_match:
-                    major_version = int(mc_version_match.group(2))
-                    if major_version >= 17:
-                        required_java = 17
-                    elif major_version >= 12:
-                        required_java = 11
-                    else:
-                        required_java = 8
-                    
-                    if java_version < required_java:
-                        print(f"{COLOR_RED}ВНИМАНИЕ: Для Minecraft {version} требуется Java {required_java} или выше!{COLOR_RESET}")
-                        print(f"{COLOR_RED}Текущая Java: {java_version}{COLOR_RESET}")
-                        print(f"{COLOR_YELLOW}Используйте команду 'установить джава' для установки подходящей версии Java{COLOR_RESET}")
-                        if not input_yes_no("Продолжить запуск? (да/нет): "):
-                            return
-            else:
-                print(f"{COLOR_YELLOW}Не удалось определить версию Java{COLOR_RESET}")
+            runtime_path, required = ensure_java_runtime(version, minecraft_dir)
+            java_path = runtime_path or java_path
         except Exception as e:
-            print(f"{COLOR_YELLOW}Не удалось проверить версию Java: {e}{COLOR_RESET}")
+            print(f"{COLOR_YELLOW}Не удалось подготовить Java от Mojang: {e}{COLOR_RESET}")
+    
+    if required is None:
+        try:
+            required = get_required_java(version, minecraft_dir)
+        except Exception:
+            required = None
+    
+    if java_path and os.path.exists(java_path):
+        java_info = get_java_info(java_path)
+        if java_info and java_info.get("major"):
+            java_version = java_info["major"]
+            print(f"{COLOR_GREEN}Найдена Java версии: {java_version}{COLOR_RESET}")
+            
+            if required and java_version < required[1]:
+                print(f"{COLOR_RED}ВНИМАНИЕ: Для Minecraft {version} требуется Java {required[1]} или выше!{COLOR_RESET}")
+                print(f"{COLOR_RED}Текущая Java: {java_version}{COLOR_RESET}")
+                print(f"{COLOR_YELLOW}Используйте команду 'джава авто' или 'установить джава' для установки подходящей версии Java{COLOR_RESET}")
+                if interactive and not input_yes_no("Продолжить запуск? (да/нет): "):
+                    return None
+        else:
+            print(f"{COLOR_YELLOW}Не удалось определить версию Java{COLOR_RESET}")
     else:
+        java_path = None
         print(f"{COLOR_YELLOW}Путь к Java не установлен, будет использована системная Java{COLOR_RESET}")
     
     print(f"{COLOR_CYAN}ЗАПУСК MINECRAFT{COLOR_RESET}")
@@ -661,12 +2304,10 @@ def launch_minecraft():
     print(f"{COLOR_GREEN}Версия:{COLOR_RESET} {version}")
     print(f"{COLOR_GREEN}Аккаунт:{COLOR_RESET} {username}")
     
-    memory_match = re.search(r'-Xmx(\d+)G', config.get("java_args", ""))
-    if memory_match:
-        memory_gb = memory_match.group(1)
-        print(f"{COLOR_GREEN}Память:{COLOR_RESET} {memory_gb}GB")
-    else:
-        print(f"{COLOR_GREEN}Память:{COLOR_RESET} 2GB (по умолчанию)")
+    java_args_text, profile_name = get_version_java_args(config, version)
+    print(f"{COLOR_GREEN}Память:{COLOR_RESET} {format_heap_size(java_args_text)}")
+    if profile_name:
+        print(f"{COLOR_GREEN}Профиль JVM:{COLOR_RESET} {profile_name}")
     
     print(f"{COLOR_GREEN}Папка:{COLOR_RESET} {minecraft_dir}")
     print(f"{COLOR_BLUE}──────────────────────────────────{COLOR_RESET}")
@@ -683,11 +2324,7 @@ def launch_minecraft():
     print(f"{COLOR_CYAN}Подготовка к запуску...{COLOR_RESET}")
     
     try:
-        minecraft_command = minecraft_launcher_lib.command.get_minecraft_command(
-            version, minecraft_dir, options
-        )
-        
-        java_args = config.get("java_args", "").split()
+        java_args = java_args_text.split()
         
         java_executable = 'java'
         if java_path:
@@ -695,20 +2332,142 @@ def launch_minecraft():
         elif platform.system() == "Linux":
             java_executable = shutil.which("java") or "java"
         
-        minecraft_command = [java_executable] + java_args + minecraft_command[1:]
+        minecraft_command, from_cache = get_launch_command(version, minecraft_dir, account, options, java_executable, java_args)
+        if from_cache:
+            print(f"{COLOR_GREEN}Команда запуска взята из кэша{COLOR_RESET}")
+        
+        cds_key, cds_mode = None, None
+        if config.get("appcds", False):
+            minecraft_command, cds_key, cds_mode = prepare_appcds(minecraft_command, version, minecraft_dir, dry_run)
+            if cds_mode == "use":
+                print(f"{COLOR_GREEN}Используется архив классов AppCDS{COLOR_RESET}")
+            elif cds_mode == "record":
+                print(f"{COLOR_YELLOW}Архив классов AppCDS будет записан при выходе из игры{COLOR_RESET}")
+        
+        if dry_run:
+            print(f"{COLOR_CYAN}Команда запуска:{COLOR_RESET}")
+            print(format_command(minecraft_command))
+            return minecraft_command
         
         print(f"{COLOR_GREEN}Запуск Minecraft...{COLOR_RESET}")
         
-        minecraft_process = subprocess.Popen(minecraft_command)
+        if config.get("warmup", False):
+            start_warmup(minecraft_command, version, minecraft_dir, config.get("warmup_budget_mb", 512))
         
-        minecraft_process.wait()
+        menu_callback = (lambda seconds: record_menu_time(cds_key, cds_mode, seconds)) if cds_key else None
+        instance = game_supervisor.start(minecraft_command, version, username, minecraft_dir, menu_callback)
         
-        print(f"{COLOR_GREEN}Minecraft завершил работу{COLOR_RESET}")
+        print(f"{COLOR_GREEN}Minecraft #{instance.id} запущен (PID {instance.process.pid}){COLOR_RESET}")
+        if interactive:
+            print(f"{COLOR_YELLOW}Лаунчер остается доступен, список запущенных игр - команда 'игры'{COLOR_RESET}")
+        return instance
         
     except Exception as e:
         print(f"{COLOR_RED}Ошибка запуска: {e}{COLOR_RESET}")
         print(f"{COLOR_YELLOW}Проверьте установку Java и наличие файлов игры{COLOR_RESET}")
-        print(f"{COLOR_YELLOW}Попробуйте установить Java 17 командой 'установить джава'{COLOR_RESET}")
+        print(f"{COLOR_YELLOW}Попробуйте установить подходящую Java командой 'установить джава'{COLOR_RESET}")
+        return None
+
+def list_game_instances():
+    instances = game_supervisor.instances()
+    if not instances:
+        print(f"{COLOR_YELLOW}Игры из этого лаунчера не запускались{COLOR_RESET}")
+        return
+    
+    print(f"{COLOR_CYAN}ЗАПУЩЕННЫЕ ИГРЫ{COLOR_RESET}")
+    print(f"{COLOR_BLUE}──────────────────────────────────{COLOR_RESET}")
+    for instance in instances:
+        if instance.running:
+            uptime = datetime.now() - instance.started_at
+            status = f"{COLOR_GREEN}работает {str(uptime).split('.')[0]}{COLOR_RESET}"
+        else:
+            status = f"{COLOR_YELLOW}завершена, код {instance.exit_code}{COLOR_RESET}"
+        print(f"#{instance.id} | PID {instance.process.pid} | {instance.version} | {instance.username} | "
+              f"запуск {instance.started_at.strftime('%H:%M:%S')} | {status}")
+    print(f"{COLOR_BLUE}──────────────────────────────────{COLOR_RESET}")
+
+def finish_running_games():
+    running = [instance for instance in game_supervisor.instances() if instance.running]
+    if not running:
+        return
+    
+    print(f"{COLOR_YELLOW}Запущенные игры:{COLOR_RESET}")
+    for instance in running:
+        print(f"#{instance.id} | PID {instance.process.pid} | {instance.version} | {instance.username}")
+    
+    try:
+        choice = input(f"{COLOR_YELLOW}Ждать завершения (ж), остановить (с) или оставить работать (Enter)? {COLOR_RESET}").strip().lower()
+    except (KeyboardInterrupt, EOFError):
+        choice = ""
+    
+    try:
+        if choice in ('ж', 'wait'):
+            print(f"{COLOR_CYAN}Ожидание завершения игр (Ctrl+C - оставить работать)...{COLOR_RESET}")
+            for instance in running:
+                instance.process.wait()
+                instance.output.wait_closed(5)
+            return
+        if choice in ('с', 'stop'):
+            for instance in running:
+                instance.process.terminate()
+            for instance in running:
+                try:
+                    instance.process.wait(10)
+                except subprocess.TimeoutExpired:
+                    instance.process.kill()
+                    instance.process.wait()
+                instance.output.wait_closed(5)
+            print(f"{COLOR_GREEN}Игры остановлены{COLOR_RESET}")
+            return
+    except KeyboardInterrupt:
+        print()
+    
+    for instance in running:
+        if instance.process.poll() is None:
+            try:
+                instance.output.detach()
+                print(f"{COLOR_GREEN}Игра #{instance.id} продолжит работу, вывод пишется в {instance.output.log_path}{COLOR_RESET}")
+            except Exception as e:
+                print(f"{COLOR_RED}Не удалось перенаправить вывод игры #{instance.id}: {e}{COLOR_RESET}")
+
+def stop_game_instance(instance_id, force=False):
+    if not instance_id.isdigit():
+        print(f"{COLOR_RED}Укажите номер игры из списка 'игры'{COLOR_RESET}")
+        return
+    
+    if game_supervisor.stop(int(instance_id), force):
+        action = "принудительно завершена" if force else "получила сигнал завершения"
+        print(f"{COLOR_GREEN}Игра #{instance_id} {action}{COLOR_RESET}")
+    else:
+        print(f"{COLOR_RED}Запущенная игра #{instance_id} не найдена{COLOR_RESET}")
+
+def show_game_output(args):
+    if not args or not args[0].isdigit():
+        print(f"{COLOR_RED}Укажите номер игры, например: 'вывод 1 WARN 100'{COLOR_RESET}")
+        return
+    
+    instance = game_supervisor.get(int(args[0]))
+    if instance is None or instance.output is None:
+        print(f"{COLOR_RED}Игра #{args[0]} не найдена{COLOR_RESET}")
+        return
+    
+    count, min_level, logger = 50, None, None
+    for arg in args[1:]:
+        if arg.isdigit():
+            count = int(arg)
+        elif arg.upper() in LOG_LEVELS:
+            min_level = arg.upper()
+        else:
+            logger = arg
+    
+    level_colors = {"WARN": COLOR_YELLOW, "ERROR": COLOR_RED, "FATAL": COLOR_RED}
+    for stream_name, level, line_logger, text in instance.output.tail(count, min_level, logger):
+        color = level_colors.get(level, "")
+        print(f"{color}{text}{COLOR_RESET}" if color else text)
+    
+    if instance.output.crash_line:
+        print(f"{COLOR_RED}Краш: {instance.output.crash_line.strip()}{COLOR_RESET}")
+    print(f"{COLOR_CYAN}Файл сессии: {instance.output.log_path}{COLOR_RESET}")
 
 def show_info():
     print(f"{COLOR_CYAN}Последние новости Minecraft{COLOR_RESET}")
@@ -720,35 +2479,481 @@ def show_info():
     print(f"{COLOR_BLUE}- https://t.me/playdacha Айпи: playdacha.ru{COLOR_RESET}")
     print(f"{COLOR_CYAN}- Ванильнный сервер майнкрафт. Есть приваты и команда /home. Маленькое и дружелюбное комьюнити.{COLOR_RESET}")
 
-def create_backup():
+def compress_backup_member(file_path, level, temp_dir):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    crc = 0
+    size = 0
+    parts = []
+    compressed_size = 0
+    spill = None
+    
+    with open(file_path, 'rb') as f:
+        for data in iter(lambda: f.read(1024 * 1024), b''):
+            crc = zlib.crc32(data, crc)
+            size += len(data)
+            parts.append(compressor.compress(data))
+            compressed_size += len(parts[-1])
+            if spill is None and compressed_size > BACKUP_INLINE_LIMIT:
+                spill = tempfile_path(temp_dir)
+                spill_file = open(spill, 'wb')
+            if spill is not None:
+                spill_file.writelines(parts)
+                parts = []
+    parts.append(compressor.flush())
+    compressed_size += len(parts[-1])
+    
+    if spill is not None:
+        spill_file.writelines(parts)
+        spill_file.close()
+        return crc, size, compressed_size, None, spill
+    return crc, size, compressed_size, b"".join(parts), None
+
+def tempfile_path(temp_dir):
+    import tempfile
+    
+    fd, path = tempfile.mkstemp(dir=temp_dir, suffix=".deflate")
+    os.close(fd)
+    return path
+
+def write_compressed_member(zipf, zinfo, data, spill_path):
+    zinfo.header_offset = zipf.fp.tell()
+    zip64 = zinfo.file_size > zipfile.ZIP64_LIMIT or zinfo.compress_size > zipfile.ZIP64_LIMIT
+    zipf.fp.write(zinfo.FileHeader(zip64))
+    if spill_path is None:
+        zipf.fp.write(data)
+    else:
+        with open(spill_path, 'rb') as f:
+            shutil.copyfileobj(f, zipf.fp, 1024 * 1024)
+        os.remove(spill_path)
+    zipf.filelist.append(zinfo)
+    zipf.NameToInfo[zinfo.filename] = zinfo
+    zipf.start_dir = zipf.fp.tell()
+    zipf._didModify = True
+
+_raw_zip_writes = None
+
+def raw_zip_writes_supported():
+    global _raw_zip_writes
+    if _raw_zip_writes is None:
+        import io
+        
+        data = b"cobalt backup probe\n" * 64
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+        compressed = compressor.compress(data) + compressor.flush()
+        buffer = io.BytesIO()
+        try:
+            with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                zinfo = zipfile.ZipInfo("probe.txt", datetime.now().timetuple()[:6])
+                zinfo.compress_type = zipfile.ZIP_DEFLATED
+                zinfo.CRC = zlib.crc32(data)
+                zinfo.file_size = len(data)
+                zinfo.compress_size = len(compressed)
+                write_compressed_member(zipf, zinfo, compressed, None)
+            with zipfile.ZipFile(buffer) as zipf:
+                _raw_zip_writes = zipf.testzip() is None and zipf.read("probe.txt") == data
+        except Exception:
+            _raw_zip_writes = False
+    return _raw_zip_writes
+
+def create_backup(compress_level=None):
+    import tempfile
+    
+    config = load_config()
+    if compress_level is not None:
+        if not compress_level.isdigit() or not 1 <= int(compress_level) <= 9:
+            print(f"{COLOR_RED}Укажите уровень сжатия от 1 до 9, например: 'бэкап zip 9'{COLOR_RESET}")
+            return
+        config["backup_compress_level"] = int(compress_level)
+        save_config(config)
+    
     desktop = Path.home() / "Desktop"
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     backup_file = desktop / f"minecraft_backup_{timestamp}.zip"
+    part_file = desktop / f"minecraft_backup_{timestamp}.zip.part"
     
-    folders_to_backup = ["saves", "resourcepacks", "config", "shaderpacks", "schematics", "mods"]
+    folders_to_backup = BACKUP_FOLDERS
+    level = min(9, max(1, int(config.get("backup_compress_level", 6))))
+    workers = os.cpu_count() or 1
+    if os.name == "nt":
+        workers = min(workers, 61)
     
-    print(f"{COLOR_CYAN}Создание резервной копии...{COLOR_RESET}")
+    print(f"{COLOR_CYAN}Создание резервной копии ({workers} процессов, deflate уровень {level})...{COLOR_RESET}")
+    started = time.time()
     
     try:
-        with zipfile.ZipFile(backup_file, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            total_files = 0
-            for folder in folders_to_backup:
-                folder_path = os.path.join(MINECRAFT_DIR, folder)
-                if os.path.exists(folder_path):
-                    for root, dirs, files in os.walk(folder_path):
-                        for file in files:
-                            file_path = os.path.join(root, file)
-                            arcname = os.path.relpath(file_path, MINECRAFT_DIR)
-                            zipf.write(file_path, arcname)
-                            total_files += 1
+        files = []
+        for folder in folders_to_backup:
+            folder_path = os.path.join(MINECRAFT_DIR, folder)
+            if os.path.exists(folder_path):
+                for root, dirs, names in os.walk(folder_path):
+                    for name in names:
+                        file_path = os.path.join(root, name)
+                        files.append((file_path, os.path.relpath(file_path, MINECRAFT_DIR)))
         
+        total_files = 0
+        total_bytes = 0
+        stored_files = 0
+        with zipfile.ZipFile(part_file, 'w', zipfile.ZIP_DEFLATED) as zipf, tempfile.TemporaryDirectory() as temp_dir:
+            compressible = []
+            for file_path, arcname in files:
+                if os.path.splitext(file_path)[1].lower() in BACKUP_STORED_EXTENSIONS:
+                    zipf.write(file_path, arcname, compress_type=zipfile.ZIP_STORED)
+                    total_bytes += os.path.getsize(file_path)
+                    stored_files += 1
+                    total_files += 1
+                else:
+                    compressible.append((file_path, arcname))
+            
+            if not raw_zip_writes_supported():
+                print(f"{COLOR_YELLOW}Параллельное сжатие недоступно в этой версии Python, файлы сжимаются по очереди{COLOR_RESET}")
+                for file_path, arcname in compressible:
+                    zipf.write(file_path, arcname, compresslevel=level)
+                    total_bytes += os.path.getsize(file_path)
+                    total_files += 1
+                compressible = []
+            
+            with concurrent_futures.ProcessPoolExecutor(max_workers=workers) as pool:
+                queue = deque(compressible)
+                futures = {}
+                while queue or futures:
+                    while queue and len(futures) < workers * 2:
+                        file_path, arcname = queue.popleft()
+                        futures[pool.submit(compress_backup_member, file_path, level, temp_dir)] = (file_path, arcname)
+                    done, _ = concurrent_futures.wait(futures, return_when=concurrent_futures.FIRST_COMPLETED)
+                    for future in done:
+                        file_path, arcname = futures.pop(future)
+                        crc, size, compressed_size, data, spill_path = future.result()
+                        zinfo = zipfile.ZipInfo.from_file(file_path, arcname)
+                        zinfo.compress_type = zipfile.ZIP_DEFLATED
+                        zinfo.CRC = crc
+                        zinfo.file_size = size
+                        zinfo.compress_size = compressed_size
+                        write_compressed_member(zipf, zinfo, data, spill_path)
+                        total_bytes += size
+                        total_files += 1
+        os.replace(part_file, backup_file)
+        
+        elapsed = max(time.time() - started, 0.001)
+        archive_size = os.path.getsize(backup_file)
         print(f"{COLOR_GREEN}Резервная копия создана!{COLOR_RESET}")
         print(f"{COLOR_CYAN}Файл: {backup_file}{COLOR_RESET}")
-        print(f"{COLOR_CYAN}Файлов сохранено: {total_files}{COLOR_RESET}")
+        print(f"{COLOR_CYAN}Файлов сохранено: {total_files} (без сжатия: {stored_files}){COLOR_RESET}")
+        print(f"{COLOR_CYAN}Размер: {total_bytes/1024/1024:.1f} MB -> {archive_size/1024/1024:.1f} MB за {elapsed:.1f} с ({total_bytes/1024/1024/elapsed:.1f} MB/s){COLOR_RESET}")
         
     except Exception as e:
+        if part_file.exists():
+            part_file.unlink()
         print(f"{COLOR_RED}Ошибка создания бэкапа: {e}{COLOR_RESET}")
 
+def backup_chunk_path(digest):
+    return os.path.join(BACKUP_CHUNKS_DIR, digest[:2], digest)
+
+def store_backup_chunk(data):
+    digest = hashlib.sha256(data).hexdigest()
+    chunk_path = backup_chunk_path(digest)
+    if os.path.exists(chunk_path):
+        return digest, 0
+    
+    compressed = zlib.compress(data, 1)
+    payload = b"Z" + compressed if len(compressed) < len(data) else b"R" + data
+    os.makedirs(os.path.dirname(chunk_path), exist_ok=True)
+    tmp_path = f"{chunk_path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, chunk_path)
+    return digest, len(payload)
+
+def read_backup_chunk(digest):
+    with open(backup_chunk_path(digest), 'rb') as f:
+        payload = f.read()
+    data = zlib.decompress(payload[1:]) if payload[:1] == b"Z" else payload[1:]
+    if hashlib.sha256(data).hexdigest() != digest:
+        raise ValueError(f"Поврежден фрагмент бэкапа {digest}")
+    return data
+
+def backup_file_chunks(file_path):
+    chunks = []
+    stored_bytes = 0
+    with open(file_path, 'rb') as f:
+        for data in iter(lambda: f.read(BACKUP_CHUNK_SIZE), b''):
+            digest, stored = store_backup_chunk(data)
+            chunks.append(digest)
+            stored_bytes += stored
+    return chunks, stored_bytes
+
+def list_backup_snapshots():
+    if not os.path.isdir(BACKUP_SNAPSHOTS_DIR):
+        return []
+    return sorted((name[:-5] for name in os.listdir(BACKUP_SNAPSHOTS_DIR) if name.endswith(".json")), reverse=True)
+
+def load_backup_snapshot(snapshot_id):
+    with open(os.path.join(BACKUP_SNAPSHOTS_DIR, f"{snapshot_id}.json"), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def create_backup_snapshot(source_dir=MINECRAFT_DIR):
+    print(f"{COLOR_CYAN}Создание инкрементальной резервной копии...{COLOR_RESET}")
+    started = time.time()
+    
+    try:
+        previous_files = {}
+        for snapshot_id in list_backup_snapshots():
+            snapshot = load_backup_snapshot(snapshot_id)
+            if snapshot.get("source") == source_dir:
+                previous_files = snapshot["files"]
+                break
+        
+        files = {}
+        changed = []
+        total_bytes = 0
+        for folder in BACKUP_FOLDERS:
+            folder_path = os.path.join(source_dir, folder)
+            for root, dirs, names in os.walk(folder_path):
+                for name in names:
+                    file_path = os.path.join(root, name)
+                    rel_path = os.path.relpath(file_path, source_dir).replace(os.sep, "/")
+                    stat = os.stat(file_path)
+                    total_bytes += stat.st_size
+                    previous = previous_files.get(rel_path)
+                    if previous and previous["size"] == stat.st_size and previous["mtime_ns"] == stat.st_mtime_ns:
+                        files[rel_path] = previous
+                    else:
+                        changed.append((rel_path, file_path, stat))
+        
+        stored_bytes = 0
+        if changed:
+            with concurrent_futures.ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as pool:
+                results = pool.map(lambda item: backup_file_chunks(item[1]), changed)
+                for (rel_path, file_path, stat), (chunks, stored) in zip(changed, results):
+                    files[rel_path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "chunks": chunks}
+                    stored_bytes += stored
+        
+        snapshot_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        existing = set(list_backup_snapshots())
+        suffix = 1
+        while snapshot_id in existing:
+            snapshot_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{suffix}"
+            suffix += 1
+        
+        write_json_atomic(os.path.join(BACKUP_SNAPSHOTS_DIR, f"{snapshot_id}.json"), {
+            "id": snapshot_id,
+            "created_at": datetime.now().isoformat(),
+            "source": source_dir,
+            "folders": BACKUP_FOLDERS,
+            "total_bytes": total_bytes,
+            "stored_bytes": stored_bytes,
+            "files": files
+        })
+        
+        print(f"{COLOR_GREEN}Резервная копия {snapshot_id} создана за {time.time() - started:.1f} с{COLOR_RESET}")
+        print(f"{COLOR_CYAN}Файлов: {len(files)}, изменено: {len(changed)}, без изменений: {len(files) - len(changed)}{COLOR_RESET}")
+        print(f"{COLOR_CYAN}Объем данных: {total_bytes/1024/1024:.1f} MB, записано нового: {stored_bytes/1024/1024:.1f} MB{COLOR_RESET}")
+        
+    except Exception as e:
+        print(f"{COLOR_RED}Ошибка создания бэкапа: {e}{COLOR_RESET}")
+
+def show_backup_snapshots():
+    snapshot_ids = list_backup_snapshots()
+    if not snapshot_ids:
+        print(f"{COLOR_YELLOW}Резервных копий пока нет{COLOR_RESET}")
+        return
+    
+    print(f"{COLOR_CYAN}РЕЗЕРВНЫЕ КОПИИ{COLOR_RESET}")
+    print(f"{COLOR_BLUE}──────────────────────────────────{COLOR_RESET}")
+    for snapshot_id in snapshot_ids:
+        snapshot = load_backup_snapshot(snapshot_id)
+        print(f"{COLOR_YELLOW}{snapshot_id}{COLOR_RESET} | файлов: {len(snapshot['files'])} | "
+              f"{snapshot.get('total_bytes', 0)/1024/1024:.1f} MB | новых данных: {snapshot.get('stored_bytes', 0)/1024/1024:.1f} MB")
+    print(f"{COLOR_BLUE}──────────────────────────────────{COLOR_RESET}")
+
+def prune_backup_snapshots():
+    config = load_config()
+    keep_last = config.get("backup_keep_last", 10)
+    keep_daily = config.get("backup_keep_daily", 7)
+    
+    snapshot_ids = list_backup_snapshots()
+    keep = set(snapshot_ids[:keep_last])
+    kept_days = set()
+    for snapshot_id in snapshot_ids:
+        day = snapshot_id[:8]
+        if day not in kept_days and len(kept_days) < keep_daily:
+            kept_days.add(day)
+            keep.add(snapshot_id)
+    
+    removed = [snapshot_id for snapshot_id in snapshot_ids if snapshot_id not in keep]
+    for snapshot_id in removed:
+        os.remove(os.path.join(BACKUP_SNAPSHOTS_DIR, f"{snapshot_id}.json"))
+    
+    referenced = set()
+    for snapshot_id in keep:
+        for entry in load_backup_snapshot(snapshot_id)["files"].values():
+            referenced.update(entry["chunks"])
+    
+    freed_bytes = 0
+    for root, dirs, names in os.walk(BACKUP_CHUNKS_DIR):
+        for name in names:
+            if name not in referenced:
+                chunk_path = os.path.join(root, name)
+                freed_bytes += os.path.getsize(chunk_path)
+                os.remove(chunk_path)
+    
+    print(f"{COLOR_GREEN}Удалено копий: {len(removed)}, осталось: {len(keep)}, освобождено {freed_bytes/1024/1024:.1f} MB{COLOR_RESET}")
+    print(f"{COLOR_CYAN}Правила: последние {keep_last} копий и по одной за {keep_daily} последних дней{COLOR_RESET}")
+
+def list_restore_sources():
+    sources = []
+    desktop = Path.home() / "Desktop"
+    if desktop.is_dir():
+        for path in sorted(desktop.glob("minecraft_backup_*.zip"), reverse=True):
+            sources.append(("zip", str(path)))
+    for snapshot_id in list_backup_snapshots():
+        sources.append(("snapshot", snapshot_id))
+    return sources
+
+def read_restore_entries(kind, reference):
+    entries = {}
+    if kind == "zip":
+        with zipfile.ZipFile(reference, 'r') as zipf:
+            for info in zipf.infolist():
+                if not info.is_dir():
+                    entries[info.filename] = {"size": info.file_size, "crc": info.CRC, "date_time": info.date_time}
+    else:
+        snapshot = load_backup_snapshot(reference)
+        entries = snapshot["files"]
+    
+    return {name: entry for name, entry in entries.items()
+            if not name.startswith("/") and ".." not in name.split("/")}
+
+def file_crc32(path):
+    crc = 0
+    with open(path, 'rb') as f:
+        for data in iter(lambda: f.read(1024 * 1024), b''):
+            crc = zlib.crc32(data, crc)
+    return crc
+
+def restore_entry_matches(entry, disk_path):
+    try:
+        stat = os.stat(disk_path)
+    except OSError:
+        return False
+    
+    if stat.st_size != entry["size"]:
+        return False
+    if "crc" in entry:
+        return file_crc32(disk_path) == entry["crc"]
+    if entry.get("mtime_ns") == stat.st_mtime_ns:
+        return True
+    
+    chunks = []
+    with open(disk_path, 'rb') as f:
+        for data in iter(lambda: f.read(BACKUP_CHUNK_SIZE), b''):
+            chunks.append(hashlib.sha256(data).hexdigest())
+    return chunks == entry["chunks"]
+
+def extract_restore_entry(zipf, name, entry, dest_path):
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    
+    if zipf is not None:
+        crc = 0
+        with zipf.open(name) as src, open(dest_path, 'wb') as dst:
+            for data in iter(lambda: src.read(1024 * 1024), b''):
+                crc = zlib.crc32(data, crc)
+                dst.write(data)
+        if crc != entry["crc"]:
+            raise ValueError(f"Контрольная сумма CRC не совпадает: {name}")
+        mtime = time.mktime(entry["date_time"] + (0, 0, -1))
+        os.utime(dest_path, (mtime, mtime))
+    else:
+        with open(dest_path, 'wb') as dst:
+            for digest in entry["chunks"]:
+                dst.write(read_backup_chunk(digest))
+        os.utime(dest_path, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+
+def restore_backup_selection(kind, reference, entries, prefix):
+    selected = {name: entry for name, entry in entries.items() if name == prefix or name.startswith(prefix + "/")}
+    target_dir = os.path.join(MINECRAFT_DIR, *prefix.split("/"))
+    staging_dir = f"{target_dir}.restore_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    
+    unchanged = 0
+    extracted = 0
+    zipf = zipfile.ZipFile(reference, 'r') if kind == "zip" else None
+    try:
+        for name, entry in selected.items():
+            relative = name[len(prefix) + 1:]
+            disk_path = os.path.join(target_dir, *relative.split("/"))
+            staged_path = os.path.join(staging_dir, *relative.split("/"))
+            
+            if restore_entry_matches(entry, disk_path):
+                os.makedirs(os.path.dirname(staged_path), exist_ok=True)
+                try:
+                    os.link(disk_path, staged_path)
+                except OSError:
+                    shutil.copy2(disk_path, staged_path)
+                unchanged += 1
+            else:
+                extract_restore_entry(zipf, name, entry, staged_path)
+                extracted += 1
+    except Exception:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+    finally:
+        if zipf is not None:
+            zipf.close()
+    
+    os.makedirs(staging_dir, exist_ok=True)
+    os.makedirs(os.path.dirname(target_dir), exist_ok=True)
+    swap_directory(staging_dir, target_dir)
+    return extracted, unchanged
+
+def restore_backup():
+    sources = list_restore_sources()
+    if not sources:
+        print(f"{COLOR_YELLOW}Резервные копии не найдены{COLOR_RESET}")
+        return
+    
+    labels = [os.path.basename(reference) if kind == "zip" else f"{reference} (инкрементальная)" for kind, reference in sources]
+    print(f"{COLOR_CYAN}ВЫБЕРИТЕ РЕЗЕРВНУЮ КОПИЮ{COLOR_RESET}")
+    source_idx = ScrollableList(labels, page_size=10).navigate()
+    if source_idx is None:
+        return
+    
+    kind, reference = sources[source_idx]
+    
+    try:
+        entries = read_restore_entries(kind, reference)
+        groups = {}
+        for name, entry in entries.items():
+            parts = name.split("/")
+            keys = [parts[0]]
+            if parts[0] == "saves" and len(parts) > 2:
+                keys.append(f"saves/{parts[1]}")
+            for key in keys:
+                count, size = groups.get(key, (0, 0))
+                groups[key] = (count + 1, size + entry["size"])
+        
+        if not groups:
+            print(f"{COLOR_YELLOW}Резервная копия пуста{COLOR_RESET}")
+            return
+        
+        prefixes = sorted(groups)
+        print(f"{COLOR_CYAN}СОДЕРЖИМОЕ: {labels[source_idx]}{COLOR_RESET}")
+        choice_idx = ScrollableList([f"{prefix} ({groups[prefix][0]} файлов, {groups[prefix][1]/1024/1024:.1f} MB)" for prefix in prefixes], page_size=15).navigate()
+        if choice_idx is None:
+            return
+        
+        prefix = prefixes[choice_idx]
+        target_dir = os.path.join(MINECRAFT_DIR, *prefix.split("/"))
+        print(f"{COLOR_YELLOW}Содержимое {target_dir} будет заменено версией из резервной копии.{COLOR_RESET}")
+        if not input_yes_no("Продолжить? (да/нет): "):
+            return
+        
+        started = time.time()
+        extracted, unchanged = restore_backup_selection(kind, reference, entries, prefix)
+        print(f"{COLOR_GREEN}Восстановлено: {prefix} за {time.time() - started:.1f} с{COLOR_RESET}")
+        print(f"{COLOR_CYAN}Извлечено файлов: {extracted}, совпадали с диском: {unchanged}{COLOR_RESET}")
+    
+    except Exception as e:
+        print(f"{COLOR_RED}Ошибка восстановления: {e}{COLOR_RESET}")
+
 def open_minecraft_folder():
     try:
         if platform.system() == "Windows":
@@ -778,65 +2983,530 @@ def open_folder(folder_name):
     except Exception as e:
         print(f"{COLOR_RED}Ошибка открытия папки: {e}{COLOR_RESET}")
 
-def copy_latest_log():
-    logs_dir = os.path.join(MINECRAFT_DIR, "logs")
+mod_cache_store = JsonFileStore(MOD_CACHE_FILE, lambda data: data if isinstance(data, dict) else {})
+
+def parse_mods_toml_lines(text):
+    data = {}
+    section = data
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        table = re.match(r'^\[\[\s*([\w.\-]+)\s*\]\]$', line)
+        if table:
+            section = {}
+            parent = data
+            keys = table.group(1).split(".")
+            for key in keys[:-1]:
+                parent = parent.setdefault(key, {})
+            parent.setdefault(keys[-1], []).append(section)
+            continue
+        value = re.match(r'^([\w\-]+)\s*=\s*(.+)$', line)
+        if value:
+            raw = value.group(2).strip()
+            if raw[:1] in ('"', "'"):
+                raw = raw[1:raw.find(raw[0], 1)]
+            else:
+                raw = raw.split("#", 1)[0].strip()
+                if raw in ("true", "false"):
+                    raw = raw == "true"
+            section[value.group(1)] = raw
+    return data
+
+def parse_mods_toml(text):
+    try:
+        return tomllib.loads(text)
+    except Exception:
+        return parse_mods_toml_lines(text)
+
+def read_jar_version(jar):
+    try:
+        manifest = jar.read("META-INF/MANIFEST.MF").decode('utf-8', errors='replace')
+    except KeyError:
+        return None
+    match = re.search(r'^Implementation-Version:\s*(\S+)', manifest, re.MULTILINE)
+    return match.group(1) if match else None
+
+def read_fabric_metadata(data, loader):
+    mod = data.get("quilt_loader", data) if loader == "quilt" else data
+    depends = {}
+    if loader == "quilt":
+        for dependency in mod.get("depends", []):
+            if isinstance(dependency, str):
+                depends[dependency] = "*"
+            elif isinstance(dependency, dict) and not dependency.get("optional"):
+                depends[dependency.get("id", "")] = str(dependency.get("versions", "*"))
+        provides = [entry if isinstance(entry, str) else entry.get("id", "") for entry in mod.get("provides", [])]
+        name = mod.get("metadata", {}).get("name")
+    else:
+        depends = {key: str(value) for key, value in data.get("depends", {}).items()}
+        provides = list(data.get("provides", []))
+        name = data.get("name")
+    
+    return {
+        "id": mod.get("id"),
+        "version": str(mod.get("version", "")),
+        "name": name or mod.get("id"),
+        "loader": loader,
+        "depends": depends,
+        "provides": provides
+    }
+
+def read_forge_metadata(data, loader, jar_version):
+    mods = []
+    dependencies = data.get("dependencies", {})
+    for mod in data.get("mods", []):
+        mod_id = mod.get("modId")
+        depends = {}
+        for dependency in dependencies.get(mod_id, []) if isinstance(dependencies, dict) else []:
+            required = dependency.get("mandatory", str(dependency.get("type", "required")).lower() == "required")
+            if required is True and dependency.get("side", "BOTH").upper() != "SERVER":
+                depends[dependency.get("modId", "")] = str(dependency.get("versionRange", "*"))
+        if loader == "forge" and "neoforge" in depends:
+            loader = "neoforge"
+        
+        version = str(mod.get("version", ""))
+        if version == "${file.jarVersion}":
+            version = jar_version or version
+        mods.append({
+            "id": mod_id,
+            "version": version,
+            "name": mod.get("displayName") or mod_id,
+            "loader": loader,
+            "depends": depends,
+            "provides": []
+        })
+    for mod in mods:
+        mod["loader"] = loader
+    return mods
+
+def read_mod_metadata(path):
+    mods = []
+    with zipfile.ZipFile(path) as jar:
+        names = set(jar.namelist())
+        for entry, loader in (("fabric.mod.json", "fabric"), ("quilt.mod.json", "quilt")):
+            if entry in names:
+                data = json.loads(jar.read(entry).decode('utf-8-sig', errors='replace'), strict=False)
+                mods.append(read_fabric_metadata(data, loader))
+        
+        for entry, loader in (("META-INF/neoforge.mods.toml", "neoforge"), ("META-INF/mods.toml", "forge")):
+            if entry in names:
+                data = parse_mods_toml(jar.read(entry).decode('utf-8', errors='replace'))
+                mods.extend(read_forge_metadata(data, loader, read_jar_version(jar)))
+                break
+    return [mod for mod in mods if mod["id"]]
+
+def scan_mod_file(path):
+    try:
+        return {"mods": read_mod_metadata(path), "error": None}
+    except Exception as e:
+        return {"mods": [], "error": str(e)}
+
+def scan_mods(mods_dir):
+    cache = mod_cache_store.load()
+    entries = {}
+    to_scan = []
+    
+    with os.scandir(mods_dir) as it:
+        for entry in it:
+            if not entry.is_file() or not entry.name.lower().endswith(".jar"):
+                continue
+            stat = entry.stat()
+            record = cache.get(entry.path)
+            if record and record["size"] == stat.st_size and record["mtime_ns"] == stat.st_mtime_ns:
+                entries[entry.path] = record
+            else:
+                to_scan.append((entry.path, stat))
+    
+    if to_scan:
+        with concurrent_futures.ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 2)) as pool:
+            for (path, stat), result in zip(to_scan, pool.map(scan_mod_file, [path for path, _ in to_scan])):
+                entries[path] = dict(result, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+    
+    stale = [path for path in cache if path not in entries and os.path.dirname(path) == mods_dir]
+    if to_scan or stale:
+        for path in stale:
+            del cache[path]
+        cache.update(entries)
+        mod_cache_store.save(cache)
+    
+    return entries, len(to_scan)
+
+def analyze_mods(entries, loader):
+    compatible = MOD_LOADER_COMPAT.get(loader, set())
+    report = {"duplicates": {}, "wrong_loader": [], "missing": {}, "errors": {}}
+    ids = {}
+    provided = set(MOD_BUILTIN_IDS)
+    active = []
+    
+    for path, entry in sorted(entries.items()):
+        name = os.path.basename(path)
+        if entry.get("error"):
+            report["errors"][name] = entry["error"]
+            continue
+        mods = entry["mods"]
+        if not mods:
+            continue
+        if loader and not any(mod["loader"] in compatible for mod in mods):
+            report["wrong_loader"].append((name, sorted({mod["loader"] for mod in mods})))
+            continue
+        
+        if loader:
+            mods = [mod for mod in mods if mod["loader"] in compatible]
+        for mod in {mod["id"]: mod for mod in mods}.values():
+            ids.setdefault(mod["id"], []).append(name)
+            provided.add(mod["id"])
+            provided.update(mod["provides"])
+            active.append((name, mod))
+    
+    report["duplicates"] = {mod_id: names for mod_id, names in ids.items() if len(names) > 1}
+    for name, mod in active:
+        missing = [dependency for dependency in mod["depends"] if dependency and dependency not in provided]
+        if missing:
+            report["missing"][f"{mod['id']} ({name})"] = missing
+    
+    report["mods"] = len(active)
+    return report
+
+def scan_mods_report(version=None, limit=20):
+    version = version or load_config().get("selected_version")
+    mods_dir = os.path.join(get_minecraft_dir_for_version(version) if version else MINECRAFT_DIR, "mods")
+    if not os.path.isdir(mods_dir):
+        print(f"{COLOR_YELLOW}Папка mods не найдена: {mods_dir}{COLOR_RESET}")
+        return None
+    
+    loader = get_selected_loader(version)
+    started = time.perf_counter()
+    try:
+        entries, scanned = scan_mods(mods_dir)
+    except Exception as e:
+        print(f"{COLOR_RED}Ошибка сканирования модов: {e}{COLOR_RESET}")
+        return None
+    report = analyze_mods(entries, loader)
+    
+    print(f"{COLOR_CYAN}МОДЫ{COLOR_RESET} ({version or 'версия не выбрана'}, модлоадер: {loader or 'нет'})")
+    print(f"{COLOR_GREEN}Файлов: {len(entries)}, модов: {report['mods']}, прочитано заново: {scanned}, {time.perf_counter() - started:.2f}с{COLOR_RESET}")
+    if not loader:
+        print(f"{COLOR_YELLOW}Выбрана версия без модлоадера - моды не будут загружены{COLOR_RESET}")
+    
+    for mod_id, names in sorted(report["duplicates"].items()):
+        print(f"{COLOR_RED}Дубликат {mod_id}:{COLOR_RESET} {', '.join(names)}")
+    for name, loaders in report["wrong_loader"][:limit]:
+        print(f"{COLOR_RED}Не для {loader}:{COLOR_RESET} {name} ({', '.join(loaders)})")
+    if len(report["wrong_loader"]) > limit:
+        print(f"{COLOR_RED}...и еще {len(report['wrong_loader']) - limit} модов не для {loader}{COLOR_RESET}")
+    for mod, missing in sorted(report["missing"].items()):
+        print(f"{COLOR_YELLOW}Нет зависимостей для {mod}:{COLOR_RESET} {', '.join(missing)}")
+    for name, error in sorted(report["errors"].items()):
+        print(f"{COLOR_RED}Не удалось прочитать {name}: {error}{COLOR_RESET}")
+    
+    if not (report["duplicates"] or report["wrong_loader"] or report["missing"] or report["errors"]):
+        print(f"{COLOR_GREEN}Проблем не найдено{COLOR_RESET}")
+    return report
+
+def copy_latest_log():
+    logs_dir = os.path.join(MINECRAFT_DIR, "logs")
+    
+    if not os.path.exists(logs_dir):
+        print(f"{COLOR_YELLOW}Папка logs не найдена{COLOR_RESET}")
+        return
+    
+    log_files = [f for f in os.listdir(logs_dir) if f.endswith('.log') or f.endswith('.txt')]
+    
+    if not log_files:
+        print(f"{COLOR_YELLOW}Лог-файлы не найдены{COLOR_RESET}")
+        return
+    
+    latest_log = max(log_files, key=lambda f: os.path.getmtime(os.path.join(logs_dir, f)))
+    source_path = os.path.join(logs_dir, latest_log)
+    desktop = Path.home() / "Desktop"
+    dest_path = desktop / f"minecraft_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+    
+    try:
+        shutil.copy2(source_path, dest_path)
+        print(f"{COLOR_GREEN}Лог скопирован на рабочий стол: {dest_path}{COLOR_RESET}")
+    except Exception as e:
+        print(f"{COLOR_RED}Ошибка копирования лога: {e}{COLOR_RESET}")
+
+log_index_store = JsonFileStore(LOG_INDEX_FILE, lambda data: data if isinstance(data, dict) else {})
+
+def find_log_files():
+    log_files = []
+    for minecraft_dir in get_game_dirs():
+        logs_dir = os.path.join(minecraft_dir, "logs")
+        if os.path.isdir(logs_dir):
+            log_files.extend(os.path.join(logs_dir, f) for f in os.listdir(logs_dir) if f.endswith(('.log', '.log.gz')))
+    return sorted(log_files, key=os.path.getmtime)
+
+def get_log_base_time(path, stat, entry=None):
+    match = re.match(r'(\d{4}-\d{2}-\d{2})', os.path.basename(path))
+    if match:
+        return datetime.strptime(match.group(1), '%Y-%m-%d').timestamp()
+    created = getattr(stat, "st_birthtime", None) or (stat.st_ctime if os.name == "nt" else None)
+    if created:
+        return datetime.combine(datetime.fromtimestamp(created).date(), datetime.min.time()).timestamp()
+    days = entry["days"] if entry else 0
+    return datetime.combine(datetime.fromtimestamp(stat.st_mtime).date() - timedelta(days=days), datetime.min.time()).timestamp()
+
+def log_header_info(header, reference=0):
+    seconds = int(header.group(1)) * 3600 + int(header.group(2)) * 60 + int(header.group(3))
+    days = max(0, -(-(reference - LOG_ROLLOVER_SLACK - seconds) // 86400))
+    return seconds + days * 86400, header.group(4).decode()
+
+def parse_log_time(value, end=False):
+    for fmt in ('%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M', '%Y-%m-%d', '%H:%M:%S', '%H:%M'):
+        try:
+            parsed = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        if not fmt.startswith('%Y'):
+            parsed = datetime.combine(datetime.now().date(), parsed.time())
+        elif fmt == '%Y-%m-%d' and end:
+            parsed = parsed.replace(hour=23, minute=59, second=59)
+        return parsed.timestamp()
+    raise ValueError(f"Неверное время: {value}")
+
+def new_log_index(stat):
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "first": None, "last": None, "days": 0, "levels": {}, "checkpoints": []}
+
+def iter_log_chunks(f):
+    offset, tail = 0, b""
+    while True:
+        chunk = f.read(LOG_CHECKPOINT_BYTES)
+        buffer = tail + chunk
+        if not buffer:
+            return
+        cut = buffer.rfind(b"\n") + 1 if chunk else len(buffer)
+        if cut == 0:
+            tail = buffer
+            continue
+        yield offset, buffer[:cut]
+        offset += cut
+        tail = buffer[cut:]
+
+def index_log_buffer(entry, buffer, offset):
+    first = LOG_HEADER_PATTERN.search(buffer)
+    if first is None:
+        return
+    last = find_log_header(buffer, buffer.rfind(b"\n", 0, len(buffer) - 1) + 1, len(buffer))
+    first_time = log_header_info(first, entry["last"] or 0)[0]
+    
+    if entry["first"] is None:
+        entry["first"] = first_time
+    entry["last"] = log_header_info(last, first_time)[0]
+    entry["days"] = int(entry["last"] // 86400)
+    entry["checkpoints"].append([first_time, offset + first.start()])
+    for level in LOG_LEVELS:
+        count = buffer.count(f"/{level}]".encode())
+        if count:
+            entry["levels"][level] = entry["levels"].get(level, 0) + count
+
+def log_index_skips(entry, since, until, min_level):
+    if since and (entry["last"] is None or entry["last"] < since):
+        return True
+    if until and (entry["first"] is None or entry["first"] > until):
+        return True
+    if min_level:
+        min_index = LOG_LEVELS.index(min_level)
+        return not any(LOG_LEVELS.index(level) >= min_index for level in entry["levels"])
+    return False
+
+def log_line_accepted(timestamp, level, since, until, min_level):
+    if (since or until) and timestamp is None:
+        return False
+    if since and timestamp < since or until and timestamp > until:
+        return False
+    return not min_level or (level in LOG_LEVELS and LOG_LEVELS.index(level) >= LOG_LEVELS.index(min_level))
+
+def find_log_header(buffer, line_start, max_back=64 * 1024):
+    position = line_start
+    while True:
+        header = LOG_HEADER_PATTERN.match(buffer, position)
+        if header or position == 0 or line_start - position > max_back:
+            return header
+        position = buffer.rfind(b"\n", 0, position - 1) + 1
+
+def search_log_buffer(path, buffer, pattern, reference, since, until, min_level, emit, start=0, end=None):
+    line_end = -1
+    for match in pattern.finditer(buffer, start, len(buffer) if end is None else end):
+        if match.start() <= line_end:
+            continue
+        line_start = buffer.rfind(b"\n", 0, match.start()) + 1
+        line_end = buffer.find(b"\n", match.end())
+        if line_end == -1:
+            line_end = len(buffer)
+        header = find_log_header(buffer, line_start)
+        timestamp, level = log_header_info(header, reference) if header else (None, None)
+        reference = timestamp if timestamp is not None else reference
+        if log_line_accepted(timestamp, level, since, until, min_level):
+            if not emit(path, level, buffer[line_start:line_end].rstrip(b"\r")):
+                return False
+    return True
+
+def index_plain_log(path, stat):
+    entry = new_log_index(stat)
+    with open(path, 'rb') as f:
+        for offset, buffer in iter_log_chunks(f):
+            index_log_buffer(entry, buffer, offset)
+    return entry
+
+def search_plain_log(path, stat, pattern, entry, since, until, min_level, emit):
+    checkpoints = entry["checkpoints"]
+    segments = ([[0, 0]] if not checkpoints or checkpoints[0][1] > 0 else []) + checkpoints
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for (timestamp, start), (next_timestamp, end) in zip(segments, segments[1:] + [[None, len(mm)]]):
+            if until and timestamp > until:
+                break
+            if since and next_timestamp is not None and next_timestamp <= since:
+                continue
+            if not search_log_buffer(path, mm, pattern, timestamp, since, until, min_level, emit, start, end):
+                break
+    return entry
+
+def search_gzip_log(path, stat, pattern, entry, since, until, min_level, emit):
+    clock = new_log_index(stat)
+    searching = True
+    with gzip.open(path, 'rb') as f:
+        for offset, buffer in iter_log_chunks(f):
+            index_log_buffer(clock, buffer, offset)
+            if searching:
+                reference = clock["checkpoints"][-1][0] if clock["checkpoints"] else 0
+                searching = search_log_buffer(path, buffer, pattern, reference, since, until, min_level, emit)
+            if not searching and entry is not None:
+                break
+    return entry or clock
+
+def search_logs(query, since=None, until=None, min_level=None, limit=200, emit=None):
+    pattern = re.compile(query.encode('utf-8'), re.IGNORECASE | re.MULTILINE)
+    index = log_index_store.load()
+    result = {"files": 0, "skipped": 0, "matches": 0, "truncated": False}
     
-    if not os.path.exists(logs_dir):
-        print(f"{COLOR_YELLOW}Папка logs не найдена{COLOR_RESET}")
-        return
+    def collect(path, level, line):
+        result["matches"] += 1
+        if emit:
+            emit(path, level, line.decode('utf-8', errors='replace'))
+        if result["matches"] >= limit:
+            result["truncated"] = True
+            return False
+        return True
     
-    log_files = [f for f in os.listdir(logs_dir) if f.endswith('.log') or f.endswith('.txt')]
+    changed = False
+    for path in find_log_files():
+        stat = os.stat(path)
+        if stat.st_size == 0:
+            continue
+        entry = index.get(path)
+        if entry and ((entry["size"], entry["mtime_ns"]) != (stat.st_size, stat.st_mtime_ns) or "days" not in entry):
+            entry = None
+        gzipped = path.endswith(".gz")
+        if entry is None and not gzipped:
+            entry = index[path] = index_plain_log(path, stat)
+            changed = True
+        
+        base_time = get_log_base_time(path, stat, entry)
+        file_since = since - base_time if since else None
+        file_until = until - base_time if until else None
+        if entry and log_index_skips(entry, file_since, file_until, min_level):
+            result["skipped"] += 1
+            continue
+        
+        result["files"] += 1
+        search = search_gzip_log if gzipped else search_plain_log
+        new_entry = search(path, stat, pattern, entry, file_since, file_until, min_level, collect)
+        if new_entry is not entry:
+            index[path] = new_entry
+            changed = True
+        if result["truncated"]:
+            break
     
-    if not log_files:
-        print(f"{COLOR_YELLOW}Лог-файлы не найдены{COLOR_RESET}")
+    if changed:
+        log_index_store.save({path: entry for path, entry in index.items() if os.path.exists(path)})
+    return result
+
+def search_logs_command(args):
+    if not args:
+        print(f"{COLOR_RED}Укажите регулярное выражение, например: 'лог поиск Exception ERROR с=12:00 по=13:00 100'{COLOR_RESET}")
         return
     
-    latest_log = max(log_files, key=lambda f: os.path.getmtime(os.path.join(logs_dir, f)))
-    source_path = os.path.join(logs_dir, latest_log)
-    desktop = Path.home() / "Desktop"
-    dest_path = desktop / f"minecraft_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+    query, since, until, min_level, limit = args[0], None, None, None, 200
+    try:
+        for arg in args[1:]:
+            key, _, value = arg.partition("=")
+            if arg.isdigit():
+                limit = int(arg)
+            elif arg.upper() in LOG_LEVELS:
+                min_level = arg.upper()
+            elif key in ("с", "from") and value:
+                since = parse_log_time(value)
+            elif key in ("по", "to") and value:
+                until = parse_log_time(value, end=True)
+            else:
+                query = f"{query} {arg}"
+    except ValueError as e:
+        print(f"{COLOR_RED}{e}{COLOR_RESET}")
+        return
     
+    level_colors = {"WARN": COLOR_YELLOW, "ERROR": COLOR_RED, "FATAL": COLOR_RED}
+    def emit(path, level, line):
+        color = level_colors.get(level, "")
+        name = os.path.basename(path)
+        print(f"{COLOR_BLUE}{name}:{COLOR_RESET} {color}{line}{COLOR_RESET}" if color else f"{COLOR_BLUE}{name}:{COLOR_RESET} {line}")
+    
+    started = time.perf_counter()
     try:
-        shutil.copy2(source_path, dest_path)
-        print(f"{COLOR_GREEN}Лог скопирован на рабочий стол: {dest_path}{COLOR_RESET}")
+        result = search_logs(query, since, until, min_level, limit, emit)
+    except re.error as e:
+        print(f"{COLOR_RED}Неверное регулярное выражение: {e}{COLOR_RESET}")
+        return
     except Exception as e:
-        print(f"{COLOR_RED}Ошибка копирования лога: {e}{COLOR_RESET}")
+        print(f"{COLOR_RED}Ошибка поиска по логам: {e}{COLOR_RESET}")
+        return
+    
+    print(f"{COLOR_CYAN}Найдено: {result['matches']}{'+' if result['truncated'] else ''}, файлов просмотрено: {result['files']}, пропущено по индексу: {result['skipped']}, {time.perf_counter() - started:.2f}с{COLOR_RESET}")
 
 def set_java_path():
     config = load_config()
     current_path = config.get("java_path", "Не установлен")
     
     print(f"\n{COLOR_CYAN}Текущий путь к Java: {current_path}{COLOR_RESET}")
+    
+    runtimes = discover_java_runtimes()
+    if runtimes:
+        print(f"{COLOR_GREEN}Найденные установки Java:{COLOR_RESET}")
+        for i, runtime in enumerate(runtimes, 1):
+            print(f"{COLOR_YELLOW}{i}.{COLOR_RESET} {format_java_runtime(runtime)}")
+    
     print(f"{COLOR_YELLOW}Примеры:{COLOR_RESET}")
     print(f"{COLOR_GREEN}  C:\\Program Files\\Java\\jdk-17\\bin\\java.exe{COLOR_RESET} - Windows")
     print(f"{COLOR_GREEN}  /usr/lib/jvm/java-17-openjdk/bin/java{COLOR_RESET} - Linux")
     
-    new_path = input(f"\n{COLOR_YELLOW}Введите новый путь к Java (Enter для сброса): {COLOR_RESET}")
+    new_path = input(f"\n{COLOR_YELLOW}Введите номер из списка или новый путь к Java (Enter для сброса): {COLOR_RESET}")
+    
+    if new_path.isdigit() and 1 <= int(new_path) <= len(runtimes):
+        new_path = runtimes[int(new_path) - 1]["path"]
     
     if new_path:
         if os.path.exists(new_path):
             config["java_path"] = new_path
+            config["java_auto"] = False
+            java_info = get_java_info(new_path)
+            if java_info and java_info.get("major"):
+                config["java_version"] = str(java_info["major"])
             save_config(config)
             print(f"{COLOR_GREEN}Путь к Java обновлен!{COLOR_RESET}")
             
-            try:
-                result = subprocess.run([new_path, "-version"], capture_output=True, text=True, shell=True)
-                java_version_output = result.stderr or result.stdout
-                version_match = re.search(r'version "(\d+)', java_version_output)
-                if version_match:
-                    java_version = int(version_match.group(1))
-                    print(f"{COLOR_GREEN}Версия Java: {java_version}{COLOR_RESET}")
-                    config["java_version"] = str(java_version)
-                    save_config(config)
-            except Exception as e:
-                print(f"{COLOR_YELLOW}Не удалось проверить версию Java: {e}{COLOR_RESET}")
+            if java_info:
+                print(f"{COLOR_GREEN}Версия Java: {java_info['version']}{COLOR_RESET}")
+            else:
+                print(f"{COLOR_YELLOW}Не удалось проверить версию Java{COLOR_RESET}")
         else:
             print(f"{COLOR_RED}Указанный путь не существует!{COLOR_RESET}")
     elif new_path == "" and current_path != "Не установлен":
         config["java_path"] = None
         config["java_version"] = "17"
+        config["java_auto"] = None
         save_config(config)
-        print(f"{COLOR_GREEN}Путь к Java сброшен, будет использована системная Java.{COLOR_RESET}")
+        print(f"{COLOR_GREEN}Путь к Java сброшен, Java будет подбираться автоматически для каждой версии.{COLOR_RESET}")
 
 def toggle_separate_dirs():
     config = load_config()
@@ -849,11 +3519,497 @@ def toggle_separate_dirs():
     if config["separate_version_dirs"]:
         print(f"{COLOR_YELLOW}Теперь каждая версия Minecraft будет установлена в отдельную папку.{COLOR_RESET}")
         print(f"{COLOR_YELLOW}Например: .minecraft_1.20.1, .minecraft_1.19.4 и т.д.{COLOR_RESET}")
+        print(f"{COLOR_YELLOW}Библиотеки и ассеты хранятся один раз в {OBJECT_STORE_DIR} и подключаются ссылками.{COLOR_RESET}")
     else:
         print(f"{COLOR_YELLOW}Все версии Minecraft будут использовать одну папку .minecraft{COLOR_RESET}")
     
     save_config(config)
 
+def fetch_published_sha256(session, url):
+    try:
+        response = session.get(f"{url}.sha256.txt", timeout=15)
+        response.raise_for_status()
+        return response.text.split()[0].lower()
+    except (requests.RequestException, IndexError):
+        return None
+
+def download_segment(session, url, part_path, start, end, progress, retries=5):
+    expected = end - start + 1
+    last_error = None
+    
+    for attempt in range(retries):
+        have = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if have == expected:
+            return
+        if have > expected:
+            os.remove(part_path)
+            have = 0
+        
+        try:
+            headers = {"Range": f"bytes={start + have}-{end}"}
+            with session.get(url, headers=headers, stream=True, timeout=30) as response:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    raise DownloadError("Сервер не поддерживает докачку")
+                with open(part_path, 'ab') as f:
+                    for chunk in response.iter_content(chunk_size=262144):
+                        f.write(chunk)
+                        progress(len(chunk))
+        except (requests.RequestException, OSError) as e:
+            last_error = e
+            time.sleep(min(0.5 * 2 ** attempt, 8))
+    
+    if os.path.getsize(part_path) != expected:
+        raise DownloadError(f"Не удалось скачать часть {part_path}: {last_error}")
+
+def remove_segment_parts(path, keep=()):
+    directory, name = os.path.split(path)
+    prefix = f"{name}.part"
+    for entry in os.listdir(directory or "."):
+        entry_path = os.path.join(directory, entry)
+        if entry.startswith(prefix) and entry[len(prefix):].isdigit() and entry_path not in keep:
+            os.remove(entry_path)
+
+def download_resumable(session, url, path, segments=4):
+    head = session.head(url, allow_redirects=True, timeout=30)
+    head.raise_for_status()
+    total_size = int(head.headers.get("content-length", 0))
+    supports_ranges = head.headers.get("accept-ranges", "").lower() == "bytes" and total_size > 0
+    
+    meta_path = f"{path}.meta"
+    meta = {"url": url, "size": total_size, "segments": max(1, segments) if supports_ranges else 1}
+    previous_meta = None
+    if os.path.exists(meta_path):
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                previous_meta = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            previous_meta = None
+    if not isinstance(previous_meta, dict):
+        previous_meta = None
+    
+    previous_segments = previous_meta.get("segments") if previous_meta else None
+    if supports_ranges and isinstance(previous_segments, int) and previous_segments > 0 and previous_meta.get("url") == url and previous_meta.get("size") == total_size:
+        meta["segments"] = previous_segments
+    
+    segment_count = meta["segments"]
+    part_paths = [f"{path}.part{i}" for i in range(segment_count)]
+    remove_segment_parts(path, part_paths if previous_meta == meta and supports_ranges else ())
+    write_json_atomic(meta_path, meta)
+    
+    lock = threading.Lock()
+    downloaded = [sum(os.path.getsize(p) for p in part_paths if os.path.exists(p))]
+    
+    def progress(size):
+        with lock:
+            downloaded[0] += size
+            if total_size > 0:
+                percent = (downloaded[0] / total_size) * 100
+                print(f"\r{COLOR_CYAN}Прогресс: {percent:.1f}% ({downloaded[0]/1024/1024:.1f} MB / {total_size/1024/1024:.1f} MB){COLOR_RESET}", end="")
+    
+    if downloaded[0]:
+        print(f"{COLOR_CYAN}Докачка с {downloaded[0]/1024/1024:.1f} MB{COLOR_RESET}")
+    
+    if supports_ranges:
+        segment_size = -(-total_size // segment_count)
+        with concurrent_futures.ThreadPoolExecutor(max_workers=segment_count) as pool:
+            futures = []
+            for i, part_path in enumerate(part_paths):
+                start = i * segment_size
+                end = min(start + segment_size, total_size) - 1
+                futures.append(pool.submit(download_segment, session, url, part_path, start, end, progress))
+            for future in futures:
+                future.result()
+    else:
+        with session.get(url, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            with open(part_paths[0], 'wb') as f:
+                for chunk in response.iter_content(chunk_size=262144):
+                    f.write(chunk)
+                    progress(len(chunk))
+    
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as out:
+        for part_path in part_paths:
+            with open(part_path, 'rb') as f:
+                shutil.copyfileobj(f, out, 1024 * 1024)
+    os.replace(tmp_path, path)
+    for part_path in part_paths:
+        os.remove(part_path)
+    os.remove(meta_path)
+    print()
+
+def java_archive_paths(url):
+    from urllib.parse import unquote
+    
+    archive_path = os.path.join(JAVA_CACHE_DIR, unquote(url.rsplit("/", 1)[-1]))
+    return archive_path, f"{archive_path}.sha256"
+
+def get_expected_java_sha256(session, url):
+    checksum_path = java_archive_paths(url)[1]
+    expected = fetch_published_sha256(session, url)
+    if expected is None and os.path.exists(checksum_path):
+        with open(checksum_path, 'r', encoding='utf-8') as f:
+            expected = f.read().strip() or None
+    return expected
+
+def remember_java_checksum(url, expected):
+    if expected:
+        with open(java_archive_paths(url)[1], 'w', encoding='utf-8') as f:
+            f.write(expected)
+
+def find_cached_java_archive(url, expected):
+    archive_path = java_archive_paths(url)[0]
+    if os.path.isfile(archive_path):
+        if expected is None or file_digest(archive_path, "sha256") == expected:
+            print(f"{COLOR_GREEN}Архив найден в кэше: {archive_path}{COLOR_RESET}")
+            return archive_path
+        os.remove(archive_path)
+    return None
+
+def get_cached_java_archive(url, session=None, expected=None):
+    os.makedirs(JAVA_CACHE_DIR, exist_ok=True)
+    session = session or requests.Session()
+    expected = expected or get_expected_java_sha256(session, url)
+    
+    archive_path = find_cached_java_archive(url, expected)
+    if archive_path:
+        return archive_path
+    
+    archive_path = java_archive_paths(url)[0]
+    download_resumable(session, url, archive_path, load_config().get("java_download_segments", 4))
+    print(f"{COLOR_GREEN}Скачивание завершено{COLOR_RESET}")
+    
+    if expected is None:
+        print(f"{COLOR_YELLOW}Контрольная сумма не опубликована, проверка SHA-256 пропущена{COLOR_RESET}")
+        return archive_path
+    
+    actual = file_digest(archive_path, "sha256")
+    if actual != expected:
+        os.remove(archive_path)
+        raise DownloadError(f"Контрольная сумма SHA-256 не совпадает (ожидалось {expected}, получено {actual})")
+    
+    remember_java_checksum(url, expected)
+    print(f"{COLOR_GREEN}Контрольная сумма SHA-256 проверена{COLOR_RESET}")
+    return archive_path
+
+class HashingTeeReader:
+    def __init__(self, source, sink, digest, progress):
+        self.source = source
+        self.sink = sink
+        self.digest = digest
+        self.progress = progress
+    
+    def read(self, size=-1):
+        data = self.source.read(size)
+        if data:
+            self.sink.write(data)
+            self.digest.update(data)
+            self.progress(len(data))
+        return data
+
+def pick_java_binary(names, binary):
+    candidates = [name for name in names if name.rstrip("/").split("/")[-2:] == ["bin", binary]]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda name: name.count("/"))
+
+def extract_tar_stream(fileobj, staging_dir):
+    extract_options = {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+    binaries = []
+    with tarfile.open(fileobj=fileobj, mode='r|gz') as tar:
+        for member in tar:
+            if member.isfile():
+                binaries.append(member.name)
+            tar.extract(member, staging_dir, **extract_options)
+    return pick_java_binary(binaries, "java")
+
+def extract_zip_archive(archive_path, staging_dir):
+    with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+        names = zip_ref.namelist()
+        zip_ref.extractall(staging_dir)
+    return pick_java_binary(names, "java.exe")
+
+def swap_directory(staging_dir, target_dir):
+    old_dir = f"{target_dir}.old"
+    if os.path.exists(old_dir):
+        shutil.rmtree(old_dir)
+    if os.path.exists(target_dir):
+        os.replace(target_dir, old_dir)
+    os.replace(staging_dir, target_dir)
+    if os.path.exists(old_dir):
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+def keep_stream_for_resume(url, stream_path, total_size):
+    archive_path = java_archive_paths(url)[0]
+    if total_size <= 0 or not 0 < os.path.getsize(stream_path) < total_size:
+        return False
+    remove_segment_parts(archive_path)
+    os.replace(stream_path, f"{archive_path}.part0")
+    write_json_atomic(f"{archive_path}.meta", {"url": url, "size": total_size, "segments": 1})
+    return True
+
+def stream_java_archive(session, url, staging_dir, expected):
+    from urllib3.exceptions import HTTPError as TransportError
+    
+    archive_path = java_archive_paths(url)[0]
+    stream_path = f"{archive_path}.stream"
+    digest = hashlib.sha256()
+    total_size = 0
+    
+    try:
+        with session.get(url, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            total_size = int(response.headers.get('content-length', 0))
+            downloaded = [0]
+            last_report = [0.0]
+            
+            def progress(size):
+                downloaded[0] += size
+                now = time.time()
+                if total_size > 0 and (now - last_report[0] >= 0.2 or downloaded[0] >= total_size):
+                    last_report[0] = now
+                    percent = (downloaded[0] / total_size) * 100
+                    print(f"\r{COLOR_CYAN}Прогресс: {percent:.1f}% ({downloaded[0]/1024/1024:.1f} MB / {total_size/1024/1024:.1f} MB){COLOR_RESET}", end="")
+            
+            with open(stream_path, 'wb') as sink:
+                reader = HashingTeeReader(response.raw, sink, digest, progress)
+                try:
+                    java_binary = extract_tar_stream(reader, staging_dir)
+                    while reader.read(262144):
+                        pass
+                except TransportError as e:
+                    raise requests.ConnectionError(e)
+        print()
+        
+        actual = digest.hexdigest()
+        if expected and actual != expected:
+            raise DownloadError(f"Контрольная сумма SHA-256 не совпадает (ожидалось {expected}, получено {actual})")
+        
+        os.replace(stream_path, archive_path)
+        remember_java_checksum(url, expected)
+        if expected:
+            print(f"{COLOR_GREEN}Контрольная сумма SHA-256 проверена{COLOR_RESET}")
+        return java_binary
+    except (requests.RequestException, tarfile.TarError, OSError):
+        if os.path.exists(stream_path):
+            keep_stream_for_resume(url, stream_path, total_size)
+        raise
+    finally:
+        if os.path.exists(stream_path):
+            os.remove(stream_path)
+
+def install_java_archive(url, ext, java_install_dir):
+    os.makedirs(JAVA_CACHE_DIR, exist_ok=True)
+    session = requests.Session()
+    expected = get_expected_java_sha256(session, url)
+    staging_dir = f"{java_install_dir}.staging"
+    if os.path.exists(staging_dir):
+        shutil.rmtree(staging_dir)
+    
+    archive_path = find_cached_java_archive(url, expected)
+    java_binary = None
+    resume_pending = os.path.exists(f"{java_archive_paths(url)[0]}.meta")
+    
+    if archive_path is None and ext == "tar.gz" and not resume_pending:
+        print(f"{COLOR_CYAN}Скачивание с распаковкой на лету...{COLOR_RESET}")
+        try:
+            java_binary = stream_java_archive(session, url, staging_dir, expected)
+            archive_path = java_archive_paths(url)[0]
+        except (requests.RequestException, DownloadError, tarfile.TarError, OSError) as e:
+            print(f"\n{COLOR_YELLOW}Потоковая загрузка прервана ({e}), переход на докачку частями{COLOR_RESET}")
+            shutil.rmtree(staging_dir, ignore_errors=True)
+    
+    if java_binary is None:
+        archive_path = archive_path or get_cached_java_archive(url, session, expected)
+        print(f"{COLOR_CYAN}Распаковка...{COLOR_RESET}")
+        if ext == "zip":
+            java_binary = extract_zip_archive(archive_path, staging_dir)
+        else:
+            with open(archive_path, 'rb') as f:
+                java_binary = extract_tar_stream(f, staging_dir)
+    
+    swap_directory(staging_dir, java_install_dir)
+    if java_binary is None:
+        return None
+    return os.path.join(java_install_dir, *java_binary.rstrip("/").split("/"))
+
+def get_runtime_platform():
+    system = platform.system()
+    machine = platform.machine().lower()
+    if system == "Windows":
+        if "arm" in machine or "aarch" in machine:
+            return "windows-arm64"
+        return "windows-x64" if "64" in machine else "windows-x86"
+    if system == "Darwin":
+        return "mac-os-arm64" if machine in ("arm64", "aarch64") else "mac-os"
+    if system == "Linux":
+        if machine in ("x86_64", "amd64"):
+            return "linux"
+        if machine in ("i386", "i686", "x86"):
+            return "linux-i386"
+    return None
+
+def get_required_java(version, minecraft_dir):
+    chain = get_version_chain(version, minecraft_dir)
+    for chain_version in chain:
+        json_path = os.path.join(minecraft_dir, "versions", chain_version, f"{chain_version}.json")
+        with open(json_path, 'r', encoding='utf-8') as f:
+            java_version = json.load(f).get("javaVersion")
+        if java_version:
+            return java_version.get("component", "jre-legacy"), int(java_version.get("majorVersion", 8))
+    return ("jre-legacy", 8) if chain else None
+
+def load_runtime_manifest(force_refresh=False):
+    cached = None
+    try:
+        with open(JAVA_RUNTIME_MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (json.JSONDecodeError, OSError):
+        pass
+    
+    if cached and not force_refresh and time.time() - cached.get("fetched_at", 0) < JAVA_RUNTIME_MANIFEST_MAX_AGE:
+        return cached["runtimes"]
+    
+    try:
+        response = requests.get(JAVA_RUNTIME_MANIFEST_URL, timeout=15)
+        response.raise_for_status()
+        cached = {"fetched_at": time.time(), "runtimes": response.json()}
+        write_json_atomic(JAVA_RUNTIME_MANIFEST_FILE, cached)
+    except (requests.RequestException, ValueError):
+        if not cached:
+            raise
+    return cached["runtimes"]
+
+def get_runtime_dir(component, minecraft_dir, platform_name=None):
+    platform_name = platform_name or get_runtime_platform()
+    return os.path.join(minecraft_dir, "runtime", component, platform_name, component)
+
+def get_runtime_java_path(runtime_dir):
+    candidates = [
+        os.path.join(runtime_dir, "bin", "java.exe"),
+        os.path.join(runtime_dir, "bin", "java"),
+        os.path.join(runtime_dir, "jre.bundle", "Contents", "Home", "bin", "java")
+    ]
+    for path in candidates:
+        if os.path.isfile(path):
+            return path
+    return None
+
+def install_java_runtime(component, minecraft_dir, downloader=None):
+    platform_name = get_runtime_platform()
+    if platform_name is None:
+        raise DownloadError(f"Mojang не публикует Java для {platform.system()} {platform.machine()}")
+    
+    runtime_dir = get_runtime_dir(component, minecraft_dir, platform_name)
+    marker_path = os.path.join(runtime_dir, ".cobalt_runtime.json")
+    try:
+        with open(marker_path, 'r', encoding='utf-8') as f:
+            installed = json.load(f).get("sha1")
+    except (json.JSONDecodeError, OSError):
+        installed = None
+    java_path = get_runtime_java_path(runtime_dir)
+    
+    try:
+        entries = load_runtime_manifest().get(platform_name, {}).get(component)
+    except (requests.RequestException, ValueError):
+        if installed and java_path:
+            return java_path
+        raise
+    if not entries:
+        raise DownloadError(f"Java {component} недоступна для {platform_name}")
+    
+    manifest_info = entries[0]["manifest"]
+    if installed == manifest_info["sha1"] and java_path:
+        return java_path
+    
+    downloader = downloader or Downloader(use_store=True, allow_symlinks=False)
+    manifest_path = os.path.join(JAVA_RUNTIME_CACHE_DIR, f"{manifest_info['sha1']}.json")
+    files = downloader.download_json(DownloadTask(manifest_info["url"], manifest_path, manifest_info["sha1"], manifest_info.get("size")))["files"]
+    
+    tasks = []
+    executables = []
+    links = []
+    for name, entry in files.items():
+        path = os.path.join(runtime_dir, *name.split("/"))
+        if entry.get("type") == "directory":
+            os.makedirs(path, exist_ok=True)
+        elif entry.get("type") == "link":
+            links.append((path, entry["target"]))
+        elif entry.get("type") == "file":
+            raw = entry["downloads"]["raw"]
+            tasks.append(DownloadTask(raw["url"], path, raw["sha1"], raw.get("size")))
+            if entry.get("executable"):
+                executables.append(path)
+    
+    print(f"{COLOR_CYAN}Java {component} ({entries[0].get('version', {}).get('name', '?')}): файлов {len(tasks)}{COLOR_RESET}")
+    failed = downloader.run(tasks)
+    for task, error in failed[:5]:
+        print(f"{COLOR_RED}{error}{COLOR_RESET}")
+    if failed:
+        raise DownloadError(f"не скачано файлов Java: {len(failed)}")
+    
+    if os.name != "nt":
+        for path in executables:
+            os.chmod(path, os.stat(path).st_mode | 0o111)
+        for path, target in links:
+            if os.path.lexists(path):
+                if os.path.islink(path) and os.readlink(path) == target:
+                    continue
+                os.remove(path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.symlink(target, path)
+    
+    write_json_atomic(marker_path, {"component": component, "sha1": manifest_info["sha1"], "version": entries[0].get("version", {}).get("name")})
+    return get_runtime_java_path(runtime_dir)
+
+def is_java_auto(config):
+    java_auto = config.get("java_auto")
+    return not config.get("java_path") if java_auto is None else java_auto
+
+def ensure_java_runtime(version, minecraft_dir):
+    required = get_required_java(version, minecraft_dir)
+    if required is None:
+        return None, None
+    
+    if get_runtime_platform() is None:
+        return None, required
+    return install_java_runtime(required[0], minecraft_dir), required
+
+def install_version_runtime():
+    config = load_config()
+    version = config.get("selected_version")
+    if not version:
+        print(f"{COLOR_RED}Версия не выбрана!{COLOR_RESET}")
+        return None
+    
+    minecraft_dir = get_minecraft_dir_for_version(version)
+    required = get_required_java(version, minecraft_dir)
+    if required is None:
+        print(f"{COLOR_RED}Версия {version} не установлена, требуемая Java неизвестна{COLOR_RESET}")
+        return None
+    
+    try:
+        java_path = install_java_runtime(required[0], minecraft_dir)
+    except Exception as e:
+        print(f"{COLOR_RED}Ошибка установки Java {required[0]}: {e}{COLOR_RESET}")
+        return None
+    
+    config["java_auto"] = True
+    save_config(config)
+    print(f"{COLOR_GREEN}Java {required[1]} для {version} готова: {java_path}{COLOR_RESET}")
+    print(f"{COLOR_CYAN}Java будет подбираться автоматически для каждой версии{COLOR_RESET}")
+    return java_path
+
+def toggle_java_auto():
+    config = load_config()
+    config["java_auto"] = not is_java_auto(config)
+    save_config(config)
+    if config["java_auto"]:
+        print(f"{COLOR_GREEN}Автовыбор Java включен: для каждой версии используется Java из её описания (Mojang){COLOR_RESET}")
+    else:
+        print(f"{COLOR_YELLOW}Автовыбор Java выключен: {config.get('java_path') or 'системная Java'}{COLOR_RESET}")
+
 def install_java():
     print(f"{COLOR_CYAN}Автоматическая установка Java...{COLOR_RESET}")
     
@@ -875,12 +4031,17 @@ def install_java():
     }
     
     print(f"{COLOR_YELLOW}Выберите версию Java для установки:{COLOR_RESET}")
-    print(f"{COLOR_RED}ВНИМАНИЕ: Для Minecraft 1.17+ требуется Java 17 или выше!{COLOR_RESET}")
+    print(f"{COLOR_RED}ВНИМАНИЕ: Для Minecraft 1.17+ требуется Java 17, для 1.20.5+ - Java 21!{COLOR_RESET}")
     
+    print(f"{COLOR_CYAN}0.{COLOR_RESET} Java от Mojang для выбранной версии (рекомендуется)")
     for key, value in java_versions.items():
         print(f"{COLOR_CYAN}{key}.{COLOR_RESET} {value['name']}")
     
-    choice = input(f"{COLOR_YELLOW}Ваш выбор (1-4, рекомендуется 3 для Java 17): {COLOR_RESET}")
+    choice = input(f"{COLOR_YELLOW}Ваш выбор (0-4, Enter - рекомендуемая): {COLOR_RESET}").strip()
+    
+    if choice in ("", "0"):
+        install_version_runtime()
+        return
     
     if choice not in java_versions:
         print(f"{COLOR_RED}Неверный выбор{COLOR_RESET}")
@@ -936,69 +4097,14 @@ def install_java():
         return
     
     java_install_dir = os.path.join(JAVA_DIR, f"java_{java_version}")
-    os.makedirs(java_install_dir, exist_ok=True)
-    
-    download_path = os.path.join(java_install_dir, f"java.{ext}")
     
     print(f"{COLOR_CYAN}Скачивание Java {java_version}...{COLOR_RESET}")
     print(f"{COLOR_YELLOW}URL: {url}{COLOR_RESET}")
     
     try:
-        response = requests.get(url, stream=True, timeout=30)
-        response.raise_for_status()
-        
-        total_size = int(response.headers.get('content-length', 0))
-        downloaded = 0
-        
-        with open(download_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-                    downloaded += len(chunk)
-                    if total_size > 0:
-                        percent = (downloaded / total_size) * 100
-                        print(f"\r{COLOR_CYAN}Прогресс: {percent:.1f}% ({downloaded/1024/1024:.1f} MB / {total_size/1024/1024:.1f} MB){COLOR_RESET}", end="")
-        
-        print(f"\n{COLOR_GREEN}Скачивание завершено{COLOR_RESET}")
-        
-        print(f"{COLOR_CYAN}Распаковка...{COLOR_RESET}")
-        
-        if ext == "zip":
-            with zipfile.ZipFile(download_path, 'r') as zip_ref:
-                zip_ref.extractall(java_install_dir)
-        else:
-            with tarfile.open(download_path, 'r:gz') as tar_ref:
-                tar_ref.extractall(java_install_dir)
+        java_exe = install_java_archive(url, ext, java_install_dir)
         
-        os.remove(download_path)
-        
-        java_exe = "java"
-        if system == "Windows":
-            for root, dirs, files in os.walk(java_install_dir):
-                if "java.exe" in files:
-                    java_exe = os.path.join(root, "java.exe")
-                    break
-            if java_exe == "java":
-                for root, dirs, files in os.walk(java_install_dir):
-                    if "bin" in dirs:
-                        bin_path = os.path.join(root, "bin")
-                        if os.path.exists(os.path.join(bin_path, "java.exe")):
-                            java_exe = os.path.join(bin_path, "java.exe")
-                            break
-        else:
-            for root, dirs, files in os.walk(java_install_dir):
-                if "java" in files and os.access(os.path.join(root, "java"), os.X_OK):
-                    java_exe = os.path.join(root, "java")
-                    break
-            if java_exe == "java":
-                for root, dirs, files in os.walk(java_install_dir):
-                    if "bin" in dirs:
-                        bin_path = os.path.join(root, "bin")
-                        if os.path.exists(os.path.join(bin_path, "java")) and os.access(os.path.join(bin_path, "java"), os.X_OK):
-                            java_exe = os.path.join(bin_path, "java")
-                            break
-        
-        if os.path.exists(java_exe):
+        if java_exe and os.path.exists(java_exe):
             config = load_config()
             config["java_path"] = java_exe
             config["java_version"] = java_version
@@ -1008,14 +4114,11 @@ def install_java():
             print(f"{COLOR_CYAN}Путь к Java: {java_exe}{COLOR_RESET}")
             
             if input_yes_no("Проверить установку Java? (да/нет): "):
-                try:
-                    result = subprocess.run([java_exe, "-version"], capture_output=True, text=True, shell=True)
-                    print(f"{COLOR_GREEN}Java версия:{COLOR_RESET}")
-                    lines = result.stderr.split('\n') if result.stderr else result.stdout.split('\n')
-                    for line in lines[:3]:
-                        print(line)
-                except Exception as e:
-                    print(f"{COLOR_RED}Ошибка проверки Java: {e}{COLOR_RESET}")
+                java_info = get_java_info(java_exe)
+                if java_info:
+                    print(f"{COLOR_GREEN}Java версия:{COLOR_RESET} {format_java_runtime(java_info)}")
+                else:
+                    print(f"{COLOR_RED}Ошибка проверки Java: не удалось запустить {java_exe}{COLOR_RESET}")
         else:
             print(f"{COLOR_YELLOW}Java установлена, но исполняемый файл не найден{COLOR_RESET}")
             print(f"{COLOR_YELLOW}Установите путь к Java вручную командой 'джава'{COLOR_RESET}")
@@ -1023,18 +4126,133 @@ def install_java():
     except Exception as e:
         print(f"{COLOR_RED}Ошибка установки Java: {e}{COLOR_RESET}")
 
-def copy_crash_reports():
-    crashes_dir = os.path.join(MINECRAFT_DIR, "crashes")
+crash_index_store = JsonFileStore(CRASH_INDEX_FILE, lambda data: data if isinstance(data, dict) and "files" in data else {"files": {}, "signatures": {}})
+
+def get_game_dirs():
+    minecraft_dirs = [MINECRAFT_DIR]
+    selected_version = load_config().get("selected_version")
+    if selected_version:
+        minecraft_dirs.append(get_minecraft_dir_for_version(selected_version))
+    return list(dict.fromkeys(minecraft_dirs))
+
+def find_crash_reports():
+    reports = {}
+    for minecraft_dir in get_game_dirs():
+        for folder in CRASH_DIRS:
+            for root, dirs, files in os.walk(os.path.join(minecraft_dir, folder)):
+                for file in files:
+                    if file.endswith('.txt') and 'crash' in file.lower():
+                        path = os.path.join(root, file)
+                        reports[path] = os.stat(path)
+    return reports
+
+def normalize_stack_frame(line):
+    frame = line.strip()[3:]
+    frame = re.sub(r'\s*[~\[].*$', '', frame)
+    frame = re.sub(r'\((\w+\.java):\d+\)', r'(\1)', frame)
+    frame = re.sub(r'\$\$Lambda[$/\w]*', '$$Lambda', frame)
+    frame = re.sub(r'(lambda\$\w+?)\$\d+', r'\1', frame)
+    return re.sub(r'\$\d+', '$', frame)
+
+def parse_crash_report(path, stat):
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        head = f.read(CRASH_HEAD_BYTES)
+    
+    description = re.search(r'^Description:\s*(.+)$', head, re.MULTILINE)
+    description = description.group(1).strip() if description else ""
+    
+    exception = ""
+    frames = []
+    body = head.split("Description:", 1)[-1].splitlines()[1:]
+    for line in body:
+        stripped = line.strip()
+        if not exception:
+            if stripped:
+                exception = stripped
+            continue
+        if stripped.startswith("at "):
+            frames.append(normalize_stack_frame(stripped))
+            if len(frames) >= CRASH_SIGNATURE_FRAMES:
+                break
+        elif frames or not stripped:
+            break
+    
+    exception_class = exception.split(":", 1)[0].strip()
+    signature = hashlib.sha1("\n".join([description, exception_class] + frames).encode('utf-8')).hexdigest()[:16]
+    
+    timestamp = stat.st_mtime
+    name_time = re.search(r'(\d{4}-\d{2}-\d{2}_\d{2}\.\d{2}\.\d{2})', os.path.basename(path))
+    if name_time:
+        timestamp = datetime.strptime(name_time.group(1), '%Y-%m-%d_%H.%M.%S').timestamp()
+    
+    return signature, timestamp, {"description": description, "exception": exception[:300], "frames": frames}
+
+def update_crash_index():
+    index = crash_index_store.load()
+    files = index["files"]
+    signatures = index["signatures"]
+    reports = find_crash_reports()
+    
+    changed = [path for path, stat in reports.items() if files.get(path, [None, None])[:2] != [stat.st_size, stat.st_mtime_ns]]
+    removed = [path for path in files if path not in reports]
+    
+    if changed:
+        with concurrent_futures.ThreadPoolExecutor(max_workers=min(16, (os.cpu_count() or 1) * 2)) as pool:
+            parsed = pool.map(lambda path: parse_crash_report(path, reports[path]), changed)
+            for path, (signature, timestamp, details) in zip(changed, parsed):
+                files[path] = [reports[path].st_size, reports[path].st_mtime_ns, signature, timestamp]
+                signatures.setdefault(signature, details)
+    
+    for path in removed:
+        del files[path]
+    
+    if changed or removed:
+        used = {entry[2] for entry in files.values()}
+        index["signatures"] = {signature: details for signature, details in signatures.items() if signature in used}
+        crash_index_store.save(index)
+    return index, len(changed)
+
+def group_crash_reports(index):
+    groups = {}
+    for path, (size, mtime_ns, signature, timestamp) in index["files"].items():
+        group = groups.get(signature)
+        if group is None:
+            group = groups[signature] = dict(index["signatures"][signature], signature=signature, count=0, first_seen=timestamp, last_seen=timestamp, latest=path)
+        group["count"] += 1
+        group["first_seen"] = min(group["first_seen"], timestamp)
+        if timestamp >= group["last_seen"]:
+            group["last_seen"] = timestamp
+            group["latest"] = path
+    return sorted(groups.values(), key=lambda group: (group["count"], group["last_seen"]), reverse=True)
+
+def show_crash_reports(count=10):
+    try:
+        count = int(count)
+        index, parsed = update_crash_index()
+    except ValueError:
+        print(f"{COLOR_RED}Укажите число (например: 'краши 10'){COLOR_RESET}")
+        return
+    except Exception as e:
+        print(f"{COLOR_RED}Ошибка чтения краш-репортов: {e}{COLOR_RESET}")
+        return
     
-    if not os.path.exists(crashes_dir):
-        print(f"{COLOR_YELLOW}Папка crashes не найдена{COLOR_RESET}")
+    groups = group_crash_reports(index)
+    if not groups:
+        print(f"{COLOR_YELLOW}Краш-репорты не найдены{COLOR_RESET}")
         return
     
-    crash_files = []
-    for root, dirs, files in os.walk(crashes_dir):
-        for file in files:
-            if file.endswith('.txt') and 'crash' in file.lower():
-                crash_files.append(os.path.join(root, file))
+    print(f"{COLOR_CYAN}КРАШИ{COLOR_RESET} (отчетов: {len(index['files'])}, различных: {len(groups)}, новых: {parsed})")
+    for i, group in enumerate(groups[:count], 1):
+        first_seen = datetime.fromtimestamp(group["first_seen"]).strftime('%d.%m.%Y %H:%M')
+        last_seen = datetime.fromtimestamp(group["last_seen"]).strftime('%d.%m.%Y %H:%M')
+        print(f"{COLOR_YELLOW}{i}.{COLOR_RESET} {COLOR_RED}x{group['count']}{COLOR_RESET} {group['description'] or 'без описания'} [{group['signature'][:8]}]")
+        print(f"   {group['exception']}")
+        if group["frames"]:
+            print(f"   at {group['frames'][0]}")
+        print(f"   {COLOR_BLUE}{first_seen} - {last_seen}, {os.path.basename(group['latest'])}{COLOR_RESET}")
+
+def copy_crash_reports():
+    crash_files = list(find_crash_reports())
     
     if not crash_files:
         print(f"{COLOR_YELLOW}Краш-репорты не найдены{COLOR_RESET}")
@@ -1063,13 +4281,117 @@ def copy_crash_reports():
     else:
         print(f"{COLOR_RED}Не удалось скопировать ни одного краш-репорта{COLOR_RESET}")
 
+def get_selected_loader(version_id):
+    version_id = (version_id or "").lower()
+    if version_id.startswith("fabric-loader"):
+        return "fabric"
+    if version_id.startswith("quilt-loader"):
+        return "quilt"
+    if "neoforge" in version_id or re.match(r'^2\d\.\d+\.\d+', version_id):
+        return "neoforge"
+    if "forge" in version_id:
+        return "forge"
+    return None
+
+class Prefetcher:
+    def __init__(self):
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.status = {}
+    
+    def start(self, config):
+        loaders = [loader for loader, title in MODLOADERS.values()]
+        selected_loader = get_selected_loader(config.get("selected_version"))
+        if selected_loader in loaders:
+            loaders.remove(selected_loader)
+            loaders.insert(0, selected_loader)
+        
+        tasks = [("manifest", lambda: load_version_manifest(quiet=True))]
+        tasks.extend((f"loader:{loader}", lambda loader=loader: load_loader_catalog(loader, quiet=True)) for loader in loaders)
+        tasks.append(("java", discover_java_runtimes))
+        tasks.append(("java-runtime", load_runtime_manifest))
+        
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(tasks,), name="prefetch", daemon=True)
+        self._thread.start()
+    
+    def _run(self, tasks):
+        for key, task in tasks:
+            if self._stop.is_set():
+                return
+            with self._lock:
+                self.status[key] = "загрузка"
+            try:
+                task()
+                result = "готово"
+            except Exception as e:
+                result = f"ошибка: {e}"
+            with self._lock:
+                self.status[key] = result
+    
+    def stop(self, timeout=0.5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+    
+    def snapshot(self):
+        with self._lock:
+            return dict(self.status)
+
+prefetcher = Prefetcher()
+
+def toggle_prefetch():
+    config = load_config()
+    config["prefetch"] = not config.get("prefetch", False)
+    save_config(config)
+    
+    status = "включена" if config["prefetch"] else "выключена"
+    print(f"{COLOR_CYAN}Фоновая предзагрузка: {COLOR_GREEN}{status}{COLOR_RESET}")
+    if config["prefetch"]:
+        print(f"{COLOR_YELLOW}При запуске лаунчер заранее загрузит список версий, модлоадеры и данные о Java.{COLOR_RESET}")
+    
+    for key, result in prefetcher.snapshot().items():
+        print(f"{COLOR_CYAN}{key}:{COLOR_RESET} {result}")
+
+def print_startup_profile():
+    total = time.perf_counter() - STARTUP_STARTED
+    print(f"{COLOR_CYAN}ПРОФИЛЬ ЗАПУСКА{COLOR_RESET}")
+    print(f"{COLOR_BLUE}──────────────────────────────────{COLOR_RESET}")
+    for name, seconds in startup_phases:
+        print(f"{name:<28} {seconds * 1000:8.1f} мс")
+    print(f"{'Всего до приглашения':<28} {total * 1000:8.1f} мс")
+    for name, seconds in LazyModule.load_times.items():
+        print(f"{'Импорт ' + name:<28} {seconds * 1000:8.1f} мс")
+    deferred = [module._name for module in LazyModule.instances if module._module is None]
+    if deferred:
+        print(f"{COLOR_YELLOW}Отложенная загрузка: {', '.join(deferred)}{COLOR_RESET}")
+    print(f"{COLOR_BLUE}──────────────────────────────────{COLOR_RESET}")
+
 def main():
+    phase_started = time.perf_counter()
     print_banner()
+    startup_phases.append(("Баннер", time.perf_counter() - phase_started))
     
+    phase_started = time.perf_counter()
+    ensure_launcher_dirs()
     config = load_config()
+    startup_phases.append(("Папки и конфигурация", time.perf_counter() - phase_started))
     
     print(f"{COLOR_MAGENTA}Не знаете команды? Введите '{COLOR_GREEN}помощь{COLOR_MAGENTA}' для списка команд{COLOR_RESET}")
     
+    if "--startup-profile" in sys.argv:
+        print_startup_profile()
+    
+    if config.get("prefetch", False):
+        prefetcher.start(config)
+    
+    try:
+        run_repl()
+    finally:
+        prefetcher.stop()
+
+def run_repl():
     while True:
         try:
             user_input = input(f"\n{COLOR_CYAN}Введите команду>{COLOR_RESET} ").strip()
@@ -1083,6 +4405,10 @@ def main():
             if cmd == 'помощь' or cmd == 'help':
                 print_help()
             
+            elif cmd == 'выход' or cmd == 'exit':
+                print(f"{COLOR_CYAN}Выход из лаунчера...{COLOR_RESET}")
+                break
+            
             elif cmd == 'акк' or cmd == 'accounts':
                 manage_accounts_scrollable()
             
@@ -1101,11 +4427,28 @@ def main():
             elif cmd == 'установить' and len(parts) > 1:
                 if parts[1] == 'джава':
                     install_java()
+                elif len(parts) > 2:
+                    run_install_queue(parts[1:])
                 else:
                     install_version(parts[1])
             
+            elif cmd == 'проверить' or cmd == 'verify':
+                check_version(parts[1] if len(parts) > 1 else None)
+            
             elif cmd == 'запуск' or cmd == 'launch':
-                launch_minecraft()
+                launch_minecraft(dry_run='--dry-run' in parts)
+            
+            elif cmd == 'игры' or cmd == 'games':
+                list_game_instances()
+            
+            elif cmd == 'стоп' and len(parts) > 1:
+                stop_game_instance(parts[1])
+            
+            elif cmd == 'убить' and len(parts) > 1:
+                stop_game_instance(parts[1], force=True)
+            
+            elif cmd == 'вывод' or cmd == 'output':
+                show_game_output(parts[1:])
             
             elif cmd == 'арг' or cmd == 'args':
                 set_java_args()
@@ -1113,8 +4456,17 @@ def main():
             elif cmd == 'память' and len(parts) > 1:
                 set_memory(parts[1])
             
-            elif cmd == 'моды':
-                open_folder("mods")
+            elif cmd == 'профиль' or cmd == 'profile':
+                plan_jvm_profile_command(parts[1:])
+            
+            elif cmd == 'профили' or cmd == 'profiles':
+                show_jvm_profiles()
+            
+            elif cmd == 'моды' or cmd == 'mods':
+                if len(parts) > 1 and parts[1].lower() in ('скан', 'scan'):
+                    scan_mods_report()
+                else:
+                    open_folder("mods")
             
             elif cmd == 'ресурспак':
                 open_folder("resourcepacks")
@@ -1146,17 +4498,38 @@ def main():
                     print(f"{COLOR_YELLOW}Заметок пока нет{COLOR_RESET}")
             
             elif cmd == 'бэкап' or cmd == 'backup':
-                create_backup()
+                if len(parts) > 1 and parts[1].lower() == 'zip':
+                    create_backup(parts[2] if len(parts) > 2 else None)
+                else:
+                    create_backup_snapshot()
+            
+            elif cmd == 'восстановить' or cmd == 'restore':
+                restore_backup()
+            
+            elif cmd == 'бэкапы' or cmd == 'backups':
+                if len(parts) > 1 and parts[1].lower() in ('очистить', 'prune'):
+                    prune_backup_snapshots()
+                else:
+                    show_backup_snapshots()
             
             elif cmd == 'папка' or cmd == 'folder':
                 open_minecraft_folder()
             
             elif cmd == 'лог' or cmd == 'log':
-                copy_latest_log()
+                if len(parts) > 1 and parts[1].lower() in ('поиск', 'search'):
+                    search_logs_command(parts[2:])
+                else:
+                    copy_latest_log()
             
             elif cmd == 'краш' or cmd == 'crash':
                 copy_crash_reports()
             
+            elif cmd == 'краши' or cmd == 'crashes':
+                show_crash_reports(parts[1] if len(parts) > 1 else 10)
+            
+            elif cmd == 'джава' and len(parts) > 1 and parts[1].lower() in ('авто', 'auto'):
+                toggle_java_auto()
+            
             elif cmd == 'джава':
                 set_java_path()
             
@@ -1166,17 +4539,103 @@ def main():
             elif cmd == 'модлоадеры' or cmd == 'modloader':
                 install_version_with_modloader()
             
+            elif cmd == 'предзагрузка' or cmd == 'prefetch':
+                toggle_prefetch()
+            
+            elif cmd == 'cds' or cmd == 'appcds':
+                toggle_appcds(parts[1:])
+            
+            elif cmd == 'прогрев' or cmd == 'warmup':
+                toggle_warmup(parts[1:])
+            
+            elif cmd == 'потоки' and len(parts) > 1:
+                set_download_workers(parts[1])
+            
             else:
                 print(f"{COLOR_RED}Неизвестная команда: {cmd}{COLOR_RESET}")
                 print(f"{COLOR_YELLOW}Введите '{COLOR_GREEN}помощь{COLOR_YELLOW}' для списка команд{COLOR_RESET}")
         
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, EOFError):
             print(f"\n{COLOR_CYAN}Выход из лаунчера...{COLOR_RESET}")
             break
         except Exception as e:
             print(f"{COLOR_RED}Ошибка: {e}{COLOR_RESET}")
+    
+    finish_running_games()
+
+def write_cli_summary(summary, summary_file=None):
+    text = json.dumps(summary, indent=2, ensure_ascii=False)
+    if summary_file:
+        write_json_atomic(summary_file, summary, indent=2)
+    print(text)
+
+def run_cli(argv):
+    from contextlib import redirect_stdout
+    
+    parser = argparse.ArgumentParser(prog="cobalt", description="Cobalt Launcher Nano")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    install_parser = subparsers.add_parser("install", help="установить одну или несколько версий")
+    install_parser.add_argument("versions", nargs="+")
+    install_parser.add_argument("--loader", choices=[loader for loader, _ in MODLOADERS.values()])
+    install_parser.add_argument("--loader-version")
+    install_parser.add_argument("--jobs", type=int, default=2)
+    install_parser.add_argument("--summary")
+    
+    verify_parser = subparsers.add_parser("verify", help="проверить и докачать файлы версий")
+    verify_parser.add_argument("versions", nargs="+")
+    verify_parser.add_argument("--no-repair", action="store_true")
+    verify_parser.add_argument("--summary")
+    
+    launch_parser = subparsers.add_parser("launch", help="запустить версию и дождаться завершения")
+    launch_parser.add_argument("--version")
+    launch_parser.add_argument("--account")
+    launch_parser.add_argument("--dry-run", action="store_true")
+    launch_parser.add_argument("--summary")
+    
+    args = parser.parse_args(argv)
+    ensure_launcher_dirs()
+    
+    with redirect_stdout(sys.stderr):
+        summary = run_cli_command(args)
+    write_cli_summary(summary, args.summary)
+    return 0 if summary["ok"] else 1
+
+def run_cli_command(args):
+    if args.command == "install":
+        started = time.perf_counter()
+        results = run_install_queue(args.versions, args.loader, args.loader_version, args.jobs)
+        return {
+            "command": "install",
+            "ok": all(result["status"] == "ok" for result in results),
+            "seconds": round(time.perf_counter() - started, 2),
+            "jobs": results
+        }
+    
+    if args.command == "verify":
+        results = [check_version(version, not args.no_repair) or {"version": version, "status": "error"} for version in args.versions]
+        return {"command": "verify", "ok": all(result["status"] == "ok" for result in results), "versions": results}
+    
+    result = launch_minecraft(dry_run=args.dry_run, version=args.version, account_ref=args.account, interactive=False)
+    summary = {"command": "launch", "ok": result is not None, "version": args.version or load_config().get("selected_version")}
+    
+    if args.dry_run and result is not None:
+        summary["java_command"] = result
+    elif result is not None:
+        summary["id"] = result.id
+        summary["pid"] = result.process.pid
+        summary["log"] = result.output.log_path
+        summary["exit_code"] = result.process.wait()
+        result.output.wait_closed(5)
+        summary["ok"] = summary["exit_code"] == 0
+    return summary
+
+startup_phases.append(("Модуль лаунчера", time.perf_counter() - phase_started))
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ("install", "verify", "launch"):
+        sys.exit(run_cli(sys.argv[1:]))
+    
     try:
         main()
     except Exception as e: